@@ -1,3 +1,8 @@
 """Connectinno Backend - FastAPI + Firebase."""
 
+import time
+
 __version__ = "0.1.0"
+
+# perf_counter() when the package was first imported: start of the startup report.
+STARTED_AT = time.perf_counter()
@@ -3,12 +3,14 @@
 import logging
 
 import httpx
-from firebase_admin import auth
 from fastapi import APIRouter, HTTPException
 
+from app.core.startup import lazy_import
 from app.models.auth import AuthResponse, LoginRequest, RegisterRequest
 from app.services import auth_service
 
+auth = lazy_import("firebase_admin.auth")
+
 logger = logging.getLogger("app.api.auth")
 
 router = APIRouter(tags=["auth"])
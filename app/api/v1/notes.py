@@ -1,26 +1,88 @@
 """Notes API - CRUD using Firestore, scoped by Firebase Auth user."""
 
 import logging
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
+from app.config import settings
+from app.core.admission import OverloadedError
 from app.core.auth import get_current_user_uid
-from app.models.note import NoteCreate, NoteResponse, NoteUpdate
+from app.core.responses import FastJSONResponse, dumps
+from app.models.note import (
+    NoteBatchGetRequest,
+    NoteBatchGetResponse,
+    NoteBatchRequest,
+    NoteBatchResponse,
+    NoteChangesResponse,
+    NoteCreate,
+    NoteResponse,
+    NoteSummary,
+    NoteUpdate,
+    to_datetime,
+)
 from app.services import note_firestore_service
+from app.services.note_events import note_events
+from app.utils.etag import etag_matches, make_etag
 
 logger = logging.getLogger("app.api.notes")
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+# Clients may store responses but must revalidate (If-None-Match) before reuse.
+CACHE_CONTROL = "private, no-cache"
 
-@router.get("", response_model=list[NoteResponse])
-async def list_notes(user_id: str = Depends(get_current_user_uid)):
-    """List user's notes."""
-    logger.info("GET /notes start user_id=%s", user_id)
+
+@router.get("", response_model=list[NoteResponse] | list[NoteSummary])
+async def list_notes(
+    request: Request,
+    limit: int = Query(settings.notes_page_size_default, ge=1, le=settings.notes_page_size_max),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    view: Literal["full", "summary"] = Query(
+        "full", description="summary: title, pin state and excerpt only (no content)"
+    ),
+    user_id: str = Depends(get_current_user_uid),
+):
+    """List a page of the user's notes (pinned first, newest first).
+
+    If more notes exist, the X-Next-Cursor response header holds the cursor
+    for the next page. view=summary returns NoteSummary items and only reads
+    those fields from Firestore.
+
+    The ETag is derived from the user's notes version marker, so a matching
+    If-None-Match is answered with 304 after one small read (no list query).
+
+    With ``Accept: application/x-ndjson`` all notes (after cursor; limit is not
+    applied) are streamed one JSON object per line, see _stream_ndjson.
+    """
+    logger.info("GET /notes start user_id=%s limit=%d view=%s", user_id, limit, view)
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return _ndjson_response(user_id, cursor, view)
     try:
-        result = note_firestore_service.list_notes(user_id)
+        version = await note_firestore_service.get_notes_version(user_id)
+        etag = make_etag("notes", version, view, limit, cursor or "")
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            logger.info("GET /notes not modified user_id=%s", user_id)
+            return Response(status_code=304, headers=headers)
+        result, next_cursor = await note_firestore_service.list_notes(
+            user_id, limit, cursor, view, version=version
+        )
         logger.info("GET /notes success user_id=%s count=%d", user_id, len(result))
-        return [_note_to_response(n) for n in result]
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        to_dict = _note_to_summary if view == "summary" else _note_to_response
+        return FastJSONResponse([to_dict(n) for n in result], headers=headers)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except OverloadedError:
+        raise
     except Exception as exc:  # noqa: BLE001
         logger.exception("GET /notes failed for user_id=%s: %s", user_id, exc)
         raise HTTPException(
@@ -32,9 +94,153 @@ async def list_notes(user_id: str = Depends(get_current_user_uid)):
 @router.post("", response_model=NoteResponse, status_code=201)
 async def create_note(body: NoteCreate, user_id: str = Depends(get_current_user_uid)):
     """Create a note."""
-    doc_id = note_firestore_service.create_note(user_id, body)
-    note = note_firestore_service.get_note(user_id, doc_id)
-    return _note_to_response(note)
+    note = await note_firestore_service.create_note(user_id, body)
+    return FastJSONResponse(_note_to_response(note), status_code=201)
+
+
+@router.post(":batch", response_model=NoteBatchResponse)
+async def batch_notes(body: NoteBatchRequest, user_id: str = Depends(get_current_user_uid)):
+    """
+    Apply mixed create/update/delete operations in one atomic commit.
+
+    Each result carries an HTTP-style status (201 created, 200 updated,
+    204 deleted, 404 not found); failed operations do not block the others.
+    A batch that does not fit in one commit (deletes also write a tombstone) gets 400.
+    """
+    try:
+        results = await note_firestore_service.batch_notes(user_id, body.operations)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    logger.info("POST /notes:batch user_id=%s operations=%d", user_id, len(results))
+    return FastJSONResponse(
+        {
+            "results": [
+                {
+                    "index": r["index"],
+                    "op": r["op"],
+                    "id": r.get("id"),
+                    "status": r["status"],
+                    "note": _note_to_response(r["note"]) if r.get("note") else None,
+                    "error": r.get("error"),
+                }
+                for r in results
+            ]
+        }
+    )
+
+
+@router.post(":batchGet", response_model=NoteBatchGetResponse)
+async def batch_get_notes(body: NoteBatchGetRequest, user_id: str = Depends(get_current_user_uid)):
+    """Fetch several notes by id in one round trip; unknown or foreign ids are listed in missing."""
+    notes, missing = await note_firestore_service.batch_get_notes(user_id, body.ids)
+    return FastJSONResponse(
+        {"notes": [_note_to_response(n) for n in notes], "missing": missing}
+    )
+
+
+@router.get("/export")
+async def export_notes(user_id: str = Depends(get_current_user_uid)):
+    """Export all of the user's notes as NDJSON, streamed straight from Firestore."""
+    return _ndjson_response(user_id, None, "full", filename="notes.ndjson")
+
+
+@router.get("/changes", response_model=NoteChangesResponse)
+async def list_changes(
+    since: datetime | None = Query(
+        None, description="Watermark from the previous response (omit for a full sync)"
+    ),
+    cursor: str | None = Query(
+        None, description="next_cursor from the previous response while has_more (replaces since)"
+    ),
+    limit: int = Query(settings.notes_page_size_default, ge=1, le=settings.notes_page_size_max),
+    user_id: str = Depends(get_current_user_uid),
+):
+    """
+    Delta sync: notes created/updated and notes deleted after ``since``.
+
+    While has_more is true, call again immediately with ``cursor=next_cursor``;
+    then keep the returned watermark as ``since`` for the next sync.
+    Changes may be delivered more than once; apply them idempotently.
+    """
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    try:
+        notes, tombstones, watermark, next_cursor = await note_firestore_service.list_changes(
+            user_id, since, limit, cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    logger.info(
+        "GET /notes/changes user_id=%s changes=%d deleted=%d has_more=%s",
+        user_id,
+        len(notes),
+        len(tombstones),
+        next_cursor is not None,
+    )
+    return FastJSONResponse(
+        {
+            "changes": [_note_to_response(n) for n in notes],
+            "deleted": [
+                {"id": t["id"], "deleted_at": to_datetime(t["deleted_at"])} for t in tombstones
+            ],
+            "watermark": to_datetime(watermark),
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get("/search", response_model=list[NoteSummary])
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=256, description="Words to find in title or content"),
+    limit: int = Query(settings.notes_page_size_default, ge=1, le=settings.notes_page_size_max),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    user_id: str = Depends(get_current_user_uid),
+):
+    """
+    Full-text search over the user's notes; every word must match (the last one
+    as a prefix unless followed by a space). Results are NoteSummary items ranked
+    by relevance, pinned and then newest first on ties; X-Next-Cursor as for GET /notes.
+    """
+    try:
+        result, next_cursor = await note_firestore_service.search_notes(user_id, q, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    logger.info("GET /notes/search user_id=%s count=%d", user_id, len(result))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return FastJSONResponse([_note_to_summary(n) for n in result], headers=headers)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_note_events(user_id: str = Depends(get_current_user_uid)):
+    """
+    Server-sent events for the user's notes, pushed from one shared storage
+    listener per user (see note_events): ``upsert`` (data: the note) and
+    ``delete`` (data: ``{"id"}``). ``ready`` is sent once subscribed; fetch
+    GET /notes/changes then to cover edits made before it. ``overflow`` means
+    the client fell behind and was dropped; resync and reconnect.
+    """
+    return StreamingResponse(
+        _stream_events(user_id),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{id}", response_model=NoteResponse)
+async def get_note(
+    request: Request,
+    note_id: str = Path(..., alias="id"),
+    user_id: str = Depends(get_current_user_uid),
+):
+    """Get a single note. Supports If-None-Match (304) with a strong ETag."""
+    note = await note_firestore_service.get_note(user_id, note_id)
+    if note is None:
+        raise HTTPException(404, "Note not found")
+    headers = {"ETag": _note_etag(note), "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(_note_to_response(note), headers=headers)
 
 
 @router.put("/{id}", response_model=NoteResponse)
@@ -45,11 +251,10 @@ async def update_note(
 ):
     """Update a note."""
     try:
-        note_firestore_service.update_note(user_id, note_id, body)
+        updated = await note_firestore_service.update_note(user_id, note_id, body)
     except ValueError:
         raise HTTPException(404, "Note not found")
-    updated = note_firestore_service.get_note(user_id, note_id)
-    return _note_to_response(updated)
+    return FastJSONResponse(_note_to_response(updated), headers={"ETag": _note_etag(updated)})
 
 
 @router.delete("/{id}", status_code=204)
@@ -59,20 +264,102 @@ async def delete_note(
 ):
     """Delete a note."""
     try:
-        note_firestore_service.delete_note(user_id, note_id)
+        await note_firestore_service.delete_note(user_id, note_id)
     except ValueError:
         raise HTTPException(404, "Note not found")
 
 
-def _note_to_response(note: dict) -> NoteResponse:
-    """Normalize Firestore doc to NoteResponse (ensure user_id and is_pinned)."""
-    is_pinned = bool(note.get("is_pinned", False))
-    return NoteResponse(
-        id=note["id"],
-        user_id=note.get("user_id", ""),
-        title=note.get("title", ""),
-        content=note.get("content", ""),
-        is_pinned=is_pinned,
-        created_at=note.get("created_at"),
-        updated_at=note.get("updated_at"),
+def _ndjson_response(
+    user_id: str, cursor: str | None, view: str, filename: str | None = None
+) -> StreamingResponse:
+    """StreamingResponse over _stream_ndjson; validates the cursor before streaming starts."""
+    if cursor:
+        try:
+            note_firestore_service.decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(
+        _stream_ndjson(user_id, cursor, view), media_type=NDJSON_MEDIA_TYPE, headers=headers
     )
+
+
+async def _stream_ndjson(user_id: str, cursor: str | None, view: str) -> AsyncIterator[bytes]:
+    """Yield one JSON line per note as Firestore streams them (constant memory)."""
+    to_dict = _note_to_summary if view == "summary" else _note_to_response
+    count = 0
+    try:
+        async for note in note_firestore_service.stream_notes(user_id, cursor, view):
+            yield dumps(to_dict(note)) + b"\n"
+            count += 1
+    except Exception:
+        # Headers are already sent; log and abort (client sees a truncated body).
+        logger.exception("NDJSON stream failed user_id=%s after count=%d", user_id, count)
+        raise
+    logger.info("NDJSON stream done user_id=%s count=%d", user_id, count)
+
+
+def _sse(event: str, data: object) -> bytes:
+    """One server-sent event."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def _stream_events(user_id: str) -> AsyncIterator[bytes]:
+    """Relay the user's note events; comment lines keep idle connections open."""
+    subscription = note_events.subscribe(user_id)
+    logger.info("GET /notes/stream open user_id=%s", user_id)
+    try:
+        yield _sse("ready", {})
+        while True:
+            event = await subscription.get(settings.note_stream_heartbeat_seconds)
+            if event is None:
+                yield b": keep-alive\n\n"
+                continue
+            kind, doc = event
+            if kind == "upsert":
+                yield _sse(kind, _note_to_response(doc))
+            elif kind == "delete":
+                yield _sse(kind, {"id": doc["id"]})
+            else:
+                yield _sse(kind, {})
+                return
+    finally:
+        note_events.unsubscribe(subscription)
+        logger.info("GET /notes/stream closed user_id=%s", user_id)
+
+
+def _note_etag(note: dict) -> str:
+    """Strong ETag of a single note from its id and updated_at."""
+    updated_at = note.get("updated_at")
+    return make_etag("note", note["id"], updated_at.isoformat() if updated_at else "")
+
+
+def _note_to_response(note: dict) -> dict:
+    """
+    Normalize Firestore doc to the NoteResponse shape as a plain dict.
+
+    Routes return these through FastJSONResponse, so the data is not validated a
+    second time against response_model (which is kept for the OpenAPI schema);
+    timestamps are converted once, here.
+    """
+    return {
+        "id": note["id"],
+        "user_id": note.get("user_id", ""),
+        "title": note.get("title", ""),
+        "content": note.get("content", ""),
+        "is_pinned": bool(note.get("is_pinned", False)),
+        "created_at": to_datetime(note.get("created_at")),
+        "updated_at": to_datetime(note.get("updated_at")),
+    }
+
+
+def _note_to_summary(note: dict) -> dict:
+    """Normalize a (possibly projected) Firestore doc to the NoteSummary shape (plain dict)."""
+    return {
+        "id": note["id"],
+        "title": note.get("title", ""),
+        "is_pinned": bool(note.get("is_pinned", False)),
+        "excerpt": note.get("excerpt"),
+        "created_at": to_datetime(note.get("created_at")),
+        "updated_at": to_datetime(note.get("updated_at")),
+    }
@@ -20,6 +20,111 @@ class Settings(BaseSettings):
     firebase_web_api_key: str = ""
     host: str = "0.0.0.0"
     port: int = 8000
+    json_backend: str = "orjson"  # "orjson" or "json" (stdlib)
+    metrics_enabled: bool = True  # latency histograms and GET /metrics
+
+    # Cold start: import firebase_admin/google SDK modules on first use, warm them up in lifespan
+    startup_lazy_imports: bool = True
+    startup_prewarm: bool = True  # Firestore channel + module preload before serving
+    startup_warmup_timeout_seconds: float = 10.0  # bound on the Firestore warm-up read
+
+    # Response compression (Accept-Encoding: br requires the brotli package, else gzip)
+    response_compression_enabled: bool = True
+    response_compression_min_bytes: int = 1024  # smaller bodies are sent as-is
+    response_gzip_level: int = 6
+    response_brotli_quality: int = 4  # 0-11; low values suit dynamic responses
+    # Most input bytes (de)compressed in one event loop step: larger response bodies and
+    # note pages are processed in slices, yielding to other requests in between (0 = no cap)
+    compression_inline_max_bytes: int = 1024 * 1024
+
+    # Logging of the app.* loggers (queued, written by a background thread)
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" or "text"
+    log_queue_size: int = 10_000  # records beyond this are dropped, never block a request
+    # Fraction of INFO/DEBUG records kept per logger (and its children); WARNING+ always kept.
+    log_sample_rates: dict[str, float] = {
+        "app.core.auth": 0.01,
+        "app.services.firestore": 0.01,
+        "app.services.firestore_async": 0.01,
+        "app.api.notes": 0.1,
+    }
+
+    # Document storage: "firestore", or "memory" / "sqlite" to run without a Firebase project
+    storage_backend: str = "firestore"
+    storage_sqlite_path: str = "./data/connectinno.sqlite3"
+
+    # Shared outbound HTTP client (Firebase Auth REST, Google signing keys)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_http2: bool = False  # requires httpx[http2]
+    http_timeout: float = 10.0
+    http_connect_timeout: float = 5.0
+
+    # Thread pool for blocking Firebase Admin SDK calls (verify_id_token, create_user, ...)
+    firebase_executor_max_workers: int = 8
+
+    # ID token verification
+    token_cache_enabled: bool = True
+    token_cache_max_size: int = 10_000
+    auth_check_revoked: bool = False  # if True, every request checks revocation (cache bypassed)
+    auth_local_verification: bool = True  # verify JWTs in-process with prefetched Google keys
+    auth_certs_url: str = (
+        "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+    )
+    auth_keys_refresh_margin_seconds: float = 300.0
+    auth_clock_skew_seconds: int = 5
+    firebase_project_id: str = ""  # defaults to the service account's project
+
+    # GET /notes pagination
+    notes_page_size_default: int = 100
+    notes_page_size_max: int = 500
+    # Operations per POST /notes:batch (and ids per :batchGet). A batch must also fit in one
+    # commit (500 writes): one per operation, plus a tombstone per delete and the version marker
+    notes_batch_max_operations: int = 500
+    note_excerpt_length: int = 160  # stored excerpt for GET /notes?view=summary (0 = none)
+    # Content of at least this many UTF-8 bytes is stored compressed (0 = never)
+    note_compression_min_bytes: int = 4096
+    note_compression_codec: str = "zlib"  # "zlib", or "zstd" (requires zstandard)
+    note_compression_level: int = 1  # 1 is ~4x faster than 6 for ~25% more bytes
+
+    # Note layout: "global" (one notes collection filtered by user_id), "subcollection"
+    # (users/{uid}/notes) or "dual" (while note_migration moves notes: new writes go to
+    # the subcollection, reads cover both)
+    notes_layout: str = "global"
+    notes_migration_batch_size: int = 200  # notes moved per transaction (2 writes each, max 250)
+
+    # Delta sync (GET /notes/changes)
+    note_tombstone_retention_days: int = 30  # sets tombstone expire_at (Firestore TTL policy)
+    note_sync_safety_lag_seconds: float = 5.0
+
+    # Per-user note list cache (write-through on create/update/delete)
+    note_cache_enabled: bool = True
+    note_cache_backend: str = "memory"
+    note_cache_max_users: int = 1_000
+    note_cache_ttl_seconds: float = 30.0
+
+    # Per-user full-text index for GET /notes/search (updated on create/update/delete)
+    note_search_max_users: int = 1_000
+    note_search_ttl_seconds: float = 600.0
+
+    # GET /notes/stream (server-sent events)
+    note_stream_queue_size: int = 256  # pending events per connection before it is dropped
+    note_stream_heartbeat_seconds: float = 15.0  # comment line keeping idle connections open
+
+    # Admission control: per-user token bucket on /notes (429) and a cap on concurrent
+    # storage calls with a bounded wait queue (503); both answer with Retry-After.
+    rate_limit_enabled: bool = True
+    rate_limit_per_second: float = 20.0  # sustained requests per user
+    rate_limit_burst: int = 60  # requests a user may make back to back
+    rate_limit_max_users: int = 10000  # buckets kept (least recently seen dropped)
+    storage_max_in_flight: int = 64  # concurrent Firestore/local storage calls
+    storage_max_waiting: int = 256  # calls queued for a slot before shedding
+    storage_wait_timeout_seconds: float = 2.0  # max wait for a slot before shedding
+    overload_retry_after_seconds: float = 1.0  # Retry-After on 503
+
+    # Single-flight: concurrent identical note reads / token verifications share one call
+    singleflight_enabled: bool = True
 
 
 settings = Settings()
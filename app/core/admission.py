@@ -0,0 +1,222 @@
+"""Admission control: per-user rate limit (429) and a global cap on in-flight storage calls (503).
+
+Overload is answered immediately with ``Retry-After`` instead of queueing without
+bound: a user over their token bucket gets 429; when all storage slots are busy
+and the wait queue is full (or the wait times out) the request gets 503.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from typing import Any, TypeVar
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+from app.core.auth import get_current_user_uid
+
+logger = logging.getLogger("app.core.admission")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class OverloadedError(Exception):
+    """Raised when a storage call cannot get a slot; answered with 503 + Retry-After."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Server overloaded, retry later")
+        self.retry_after = retry_after
+
+
+def _retry_after_header(seconds: float) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key (user id): ``rate`` tokens per second up to ``burst``.
+    Buckets of the least recently seen keys are dropped above ``max_keys`` (a
+    dropped bucket restarts full, which only ever errs towards admitting).
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, at)
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; returns 0 if admitted, else seconds until enough tokens accrue."""
+        now = time.monotonic()
+        tokens, at = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - at) * self.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+            self.allowed += 1
+        else:
+            wait = (cost - tokens) / self.rate if self.rate > 0 else 60.0
+            self.limited += 1
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> dict[str, int]:
+        return {"users": len(self._buckets), "allowed": self.allowed, "limited": self.limited}
+
+
+class ConcurrencyLimiter:
+    """
+    At most ``max_in_flight`` concurrent calls; up to ``max_waiting`` more wait
+    (each at most ``wait_timeout`` seconds) for a slot. Beyond that, or on timeout,
+    OverloadedError is raised right away.
+
+    Reentrant per task: a call made while the current task already holds a slot
+    (e.g. list_documents_where consuming stream_documents_where) does not take a
+    second one, so nested calls cannot deadlock a saturated limiter. The slot is
+    marked in a ContextVar that release() resets to its previous value.
+    """
+
+    def __init__(self, max_in_flight: int, max_waiting: int, wait_timeout: float) -> None:
+        self._held: ContextVar[bool] = ContextVar(f"limiter_held_{id(self)}", default=False)
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self) -> Token[bool] | None:
+        """
+        Take a slot, waiting in the bounded queue if none is free.
+        :return: The token to pass to release(), or None if the current task already
+            holds a slot (nothing to release).
+        """
+        if self._held.get():
+            return None
+        if self._semaphore.locked():
+            if self.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise OverloadedError(settings.overload_retry_after_seconds)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise OverloadedError(settings.overload_retry_after_seconds) from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        return self._held.set(True)
+
+    def release(self, token: Token[bool]) -> None:
+        """Give back the slot taken by the acquire() that returned ``token`` (same context)."""
+        self._held.reset(token)
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_in_flight": self.max_in_flight,
+            "max_waiting": self.max_waiting,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def limited(limiter: ConcurrencyLimiter) -> Callable[[F], F]:
+    """
+    Decorator holding a limiter slot for the duration of a coroutine. An async
+    generator holds one only while it produces each item (one Firestore fetch),
+    not while the consumer processes it between items.
+    """
+
+    def decorate(func: F) -> F:
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def gen_wrapper(*args, **kwargs):
+                items = func(*args, **kwargs)
+                try:
+                    while True:
+                        token = await limiter.acquire()
+                        try:
+                            item = await items.__anext__()
+                        except StopAsyncIteration:
+                            return
+                        finally:
+                            if token is not None:
+                                limiter.release(token)
+                        yield item
+                finally:
+                    await items.aclose()
+
+            return gen_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            token = await limiter.acquire()
+            if token is None:
+                return await func(*args, **kwargs)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                limiter.release(token)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+user_rate_limiter = TokenBucketLimiter(
+    settings.rate_limit_per_second, settings.rate_limit_burst, settings.rate_limit_max_users
+)
+storage_limiter = ConcurrencyLimiter(
+    settings.storage_max_in_flight,
+    settings.storage_max_waiting,
+    settings.storage_wait_timeout_seconds,
+)
+
+
+async def limit_user_rate(user_id: str = Depends(get_current_user_uid)) -> str:
+    """
+    Dependency applied after get_current_user_uid: 429 with Retry-After when the
+    user exceeds RATE_LIMIT_PER_SECOND (bursts up to RATE_LIMIT_BURST).
+    :return: The user's uid.
+    """
+    if settings.rate_limit_enabled:
+        wait = user_rate_limiter.acquire(user_id)
+        if wait > 0:
+            logger.info("Rate limited user_id=%s retry_after=%.2fs", user_id, wait)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers=_retry_after_header(wait),
+            )
+    return user_id
+
+
+async def overloaded_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    """Exception handler: OverloadedError -> 503 with Retry-After."""
+    logger.warning("Load shed %s %s", request.method, request.url.path)
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers=_retry_after_header(exc.retry_after),
+    )
@@ -5,19 +5,55 @@ import logging
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from firebase_admin import auth
+from app.config import settings
+from app.core.executor import run_blocking
+from app.core.firebase import get_project_id
+from app.core.id_token import key_store, unverified_header, verify_id_token
+from app.core.metrics import AUTH_CALL_SECONDS, timer
+from app.core.singleflight import SingleFlight
+from app.core.startup import lazy_import
+from app.core.token_cache import token_cache
+
+auth = lazy_import("firebase_admin.auth")
 
 logger = logging.getLogger("app.core.auth")
 
 security = HTTPBearer(auto_error=False)
 
+# Concurrent requests carrying the same (not yet cached) token share one verification.
+token_verifications = SingleFlight(settings.singleflight_enabled)
+
+
+async def _verify_token(token: str) -> dict:
+    """
+    Verify token in-process with prefetched signing keys when possible.
 
-def get_current_user_uid(
+    Falls back to auth.verify_id_token (on the Firebase executor) when local
+    verification is disabled, revocation checks are on, or the token's key id
+    is not loaded yet (a background key refresh is requested in that case).
+    """
+    if settings.auth_local_verification and not settings.auth_check_revoked:
+        project_id = get_project_id()
+        if project_id and key_store.has_key(unverified_header(token).get("kid")):
+            with timer(AUTH_CALL_SECONDS, "verify_id_token_local"):
+                return verify_id_token(
+                    token, key_store.keys, project_id, settings.auth_clock_skew_seconds
+                )
+        key_store.request_refresh()
+    with timer(AUTH_CALL_SECONDS, "verify_id_token"):
+        return await run_blocking(
+            auth.verify_id_token, token, check_revoked=settings.auth_check_revoked
+        )
+
+
+async def get_current_user_uid(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
 ) -> str:
     """
     Verify Firebase ID token from Authorization: Bearer <token> and return uid.
-    Raises 401 if missing or invalid.
+    Verified tokens are cached until their exp claim (see token_cache) unless
+    AUTH_CHECK_REVOKED is on; concurrent verifications of the same token are
+    coalesced (token_verifications). Raises 401 if missing or invalid.
     """
     if credentials is None:
         logger.warning("Missing Authorization header on protected endpoint")
@@ -28,14 +64,19 @@ def get_current_user_uid(
         )
     token = credentials.credentials
     logger.info("Verifying Firebase ID token (truncated) token_prefix=%s", token[:10] if token else "None")
-    try:
-        decoded = auth.verify_id_token(token)
-    except (ValueError, auth.InvalidIdTokenError) as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
+    use_cache = settings.token_cache_enabled and not settings.auth_check_revoked
+    decoded = token_cache.get(token) if use_cache else None
+    if decoded is None:
+        try:
+            decoded = await token_verifications.do(token, lambda: _verify_token(token))
+        except (ValueError, auth.InvalidIdTokenError, auth.UserDisabledError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            ) from e
+        if use_cache:
+            token_cache.put(token, decoded)
     uid = decoded.get("uid")
     logger.info("Firebase ID token verified uid=%s", uid)
     if not uid:
@@ -0,0 +1,95 @@
+"""Bounded thread pool for blocking Firebase Admin SDK calls (auth, sync Firestore, etc.)."""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger("app.core.executor")
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+_stats: dict[str, float] = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "queued": 0,
+    "running": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared executor, creating it on first use (size from settings)."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.firebase_executor_max_workers,
+                    thread_name_prefix="firebase",
+                )
+                logger.info(
+                    "Firebase executor started max_workers=%d",
+                    settings.firebase_executor_max_workers,
+                )
+    return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Shut down the shared executor (called on app shutdown)."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable on the Firebase executor and await its result.
+
+    Tracks queue depth (submitted but not yet started) and time spent waiting
+    for a free worker, see get_executor_stats().
+    """
+    loop = asyncio.get_running_loop()
+    submitted_at = time.perf_counter()
+    with _lock:
+        _stats["submitted"] += 1
+        _stats["queued"] += 1
+
+    def _call() -> T:
+        waited = time.perf_counter() - submitted_at
+        with _lock:
+            _stats["queued"] -= 1
+            _stats["running"] += 1
+            _stats["wait_seconds_total"] += waited
+            _stats["wait_seconds_max"] = max(_stats["wait_seconds_max"], waited)
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            with _lock:
+                _stats["failed"] += 1
+            raise
+        finally:
+            with _lock:
+                _stats["running"] -= 1
+                _stats["completed"] += 1
+        return result
+
+    return await loop.run_in_executor(get_executor(), _call)
+
+
+def get_executor_stats() -> dict[str, float]:
+    """Snapshot of executor counters (queue depth, running, wait times)."""
+    with _lock:
+        stats = dict(_stats)
+    stats["max_workers"] = settings.firebase_executor_max_workers
+    return stats
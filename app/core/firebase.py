@@ -1,22 +1,40 @@
-"""Firebase Admin SDK initialization: Realtime Database and Firestore."""
+"""Firebase Admin SDK initialization: Realtime Database and Firestore (sync and async)."""
 
+import asyncio
+import logging
 from pathlib import Path
 
-from firebase_admin import credentials, db, firestore, initialize_app
-
 from app.config import settings
+from app.core.startup import lazy_import
+
+firebase_admin = lazy_import("firebase_admin")
+credentials = lazy_import("firebase_admin.credentials")
+db = lazy_import("firebase_admin.db")
+firestore = lazy_import("firebase_admin.firestore")
+firestore_async = lazy_import("firebase_admin.firestore_async")
+
+logger = logging.getLogger("app.core.firebase")
 
 _app = None
 _db_ref = None
 _firestore_client = None
+_firestore_async_client = None
 
 
 def init_firebase() -> None:
-    """Initialize Firebase Admin SDK, Realtime Database and Firestore."""
-    global _app, _db_ref, _firestore_client
+    """Initialize Firebase Admin SDK, Realtime Database and Firestore (sync and async clients)."""
+    global _app, _db_ref, _firestore_client, _firestore_async_client
     if _app is not None:
         return
     cred_path = Path(settings.firebase_credentials_path)
+    if not cred_path.exists() and settings.storage_backend != "firestore":
+        # Local storage backend: the API runs without Firebase (ID tokens are then
+        # only verified locally, with FIREBASE_PROJECT_ID and injected signing keys).
+        logger.warning(
+            "Firebase credentials not found; running with STORAGE_BACKEND=%s only",
+            settings.storage_backend,
+        )
+        return
     if not cred_path.exists():
         raise FileNotFoundError(
             f"Firebase credentials not found at {cred_path}. "
@@ -24,17 +42,30 @@ def init_firebase() -> None:
         )
     cred = credentials.Certificate(str(cred_path))
     opts = {"databaseURL": settings.firebase_database_url} if settings.firebase_database_url else {}
-    _app = initialize_app(cred, opts)
+    _app = firebase_admin.initialize_app(cred, opts)
     if settings.firebase_database_url:
         _db_ref = db.reference()
     _firestore_client = firestore.client()
+    _firestore_async_client = firestore_async.client()
+
+
+async def warm_up_firestore(timeout: float) -> None:
+    """
+    Open the Firestore gRPC channel and fetch an OAuth token with one small read,
+    so the first request does not pay for it. No-op without an async client.
+    """
+    client = _firestore_async_client
+    if client is None:
+        return
+    await asyncio.wait_for(client.collection("_warmup").document("_warmup").get(), timeout)
 
 
 def close_firebase() -> None:
     """Clean up Firebase (optional; SDK has no explicit close)."""
-    global _app, _db_ref, _firestore_client
+    global _app, _db_ref, _firestore_client, _firestore_async_client
     _db_ref = None
     _firestore_client = None
+    _firestore_async_client = None
     _app = None
 
 
@@ -46,3 +77,15 @@ def get_db() -> "db.Reference | None":
 def get_firestore():
     """Return Firestore client. Available after init_firebase()."""
     return _firestore_client
+
+
+def get_firestore_async():
+    """Return asyncio Firestore client (``AsyncClient``). Available after init_firebase()."""
+    return _firestore_async_client
+
+
+def get_project_id() -> str | None:
+    """Return the Firebase project ID (FIREBASE_PROJECT_ID or the initialized app's project)."""
+    if settings.firebase_project_id:
+        return settings.firebase_project_id
+    return _app.project_id if _app is not None else None
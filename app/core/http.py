@@ -0,0 +1,57 @@
+"""Shared, pooled httpx client for outbound REST calls (Firebase Auth REST, Google keys)."""
+
+import importlib.util
+import logging
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger("app.core.http")
+
+_client: httpx.AsyncClient | None = None
+
+
+def _build_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    http2 = settings.http_http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP_HTTP2 is set but the 'h2' package is missing; using HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+        transport=transport,
+    )
+
+
+async def init_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """
+    Create the shared client (call once in the app lifespan).
+    :param transport: Optional transport, e.g. httpx.MockTransport to stub Firebase locally.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = _build_client(transport)
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client (created on first use outside the lifespan)."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
@@ -0,0 +1,178 @@
+"""Local Firebase ID token verification with background-refreshed Google signing keys."""
+
+import asyncio
+import base64
+import json
+import logging
+import re
+import time
+from typing import Any, Mapping
+
+from app.config import settings
+from app.core.http import get_http_client
+from app.core.metrics import AUTH_CALL_SECONDS, timed
+from app.core.startup import lazy_import
+
+google_auth_exceptions = lazy_import("google.auth.exceptions")
+jwt = lazy_import("google.auth.jwt")
+
+logger = logging.getLogger("app.core.id_token")
+
+GOOGLE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+ISSUER_PREFIX = "https://securetoken.google.com/"
+DEFAULT_MAX_AGE = 3600.0
+MIN_REFRESH_INTERVAL = 30.0
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class InvalidIdTokenError(ValueError):
+    """Raised when a token fails local verification (signature, claims or format)."""
+
+
+class SigningKeyStore:
+    """
+    Google public signing keys (``kid`` -> PEM certificate) for Firebase ID tokens.
+
+    Keys are fetched once at startup and refreshed in the background before their
+    Cache-Control max-age expires, so verification never waits on a download.
+    Keys can also be injected with set_keys() (e.g. locally generated keys for
+    offline testing); injected keys without max_age are never refreshed.
+    """
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, refresh_margin: float = 300.0) -> None:
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self._keys: dict[str, str] = {}
+        self._expires_at: float | None = None
+        self._last_refresh = 0.0
+        self._task: asyncio.Task | None = None
+        self._refresh_requested: asyncio.Event | None = None
+
+    @property
+    def keys(self) -> Mapping[str, str]:
+        """Current keys (kid -> PEM)."""
+        return self._keys
+
+    def has_key(self, kid: str | None) -> bool:
+        """True if a key with this kid is loaded."""
+        return kid is not None and kid in self._keys
+
+    def set_keys(self, keys: Mapping[str, str], max_age: float | None = None) -> None:
+        """Replace keys. With max_age, the background task refreshes them before expiry."""
+        self._keys = dict(keys)
+        self._expires_at = time.time() + max_age if max_age is not None else None
+
+    @timed(AUTH_CALL_SECONDS, "fetch_signing_keys")
+    async def refresh(self) -> float:
+        """Download keys from Google and return their max-age in seconds."""
+        resp = await get_http_client().get(self.url)
+        resp.raise_for_status()
+        match = _MAX_AGE_RE.search(resp.headers.get("cache-control", ""))
+        max_age = float(match.group(1)) if match else DEFAULT_MAX_AGE
+        self.set_keys(resp.json(), max_age)
+        self._last_refresh = time.time()
+        logger.info("Signing keys refreshed count=%d max_age=%ds", len(self._keys), max_age)
+        return max_age
+
+    def request_refresh(self) -> None:
+        """Ask the background task to refresh now (e.g. unknown kid after key rotation).
+
+        Ignored if the last refresh is more recent than MIN_REFRESH_INTERVAL.
+        """
+        if time.time() - self._last_refresh < MIN_REFRESH_INTERVAL:
+            return
+        if self._refresh_requested is not None:
+            self._refresh_requested.set()
+
+    async def start(self) -> None:
+        """Prefetch keys (unless injected) and start the background refresh task."""
+        if self._task is not None:
+            return
+        if not self._keys:
+            try:
+                await self.refresh()
+            except Exception:  # noqa: BLE001
+                logger.exception("Initial signing key fetch failed; will retry in background")
+        self._refresh_requested = asyncio.Event()
+        self._task = asyncio.create_task(self._refresh_loop(), name="signing-key-refresh")
+
+    async def stop(self) -> None:
+        """Cancel the background refresh task."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _next_delay(self) -> float | None:
+        if not self._keys:
+            return MIN_REFRESH_INTERVAL
+        if self._expires_at is None:
+            return None
+        return max(self._expires_at - time.time() - self.refresh_margin, MIN_REFRESH_INTERVAL)
+
+    async def _refresh_loop(self) -> None:
+        assert self._refresh_requested is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=self._next_delay())
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+            try:
+                await self.refresh()
+            except Exception:  # noqa: BLE001
+                logger.exception("Signing key refresh failed; keeping current keys")
+
+
+def unverified_header(token: str) -> dict[str, Any]:
+    """Return the (unverified) JWT header, or {} if malformed."""
+    try:
+        header_b64 = token.split(".", 1)[0]
+        header_b64 += "=" * (-len(header_b64) % 4)
+        header = json.loads(base64.urlsafe_b64decode(header_b64))
+    except (ValueError, AttributeError):
+        return {}
+    return header if isinstance(header, dict) else {}
+
+
+def verify_id_token(
+    token: str,
+    keys: Mapping[str, str],
+    project_id: str,
+    clock_skew_seconds: int = 0,
+) -> dict[str, Any]:
+    """
+    Verify a Firebase ID token locally (RS256 signature, exp/iat, aud, iss, sub, auth_time).
+    :return: Decoded claims with ``uid`` set (same shape as firebase_admin.auth.verify_id_token).
+    :raises InvalidIdTokenError: if the token is invalid.
+    """
+    if unverified_header(token).get("alg") != "RS256":
+        raise InvalidIdTokenError("Token has incorrect algorithm; expected RS256")
+    try:
+        claims = jwt.decode(
+            token,
+            certs=keys,
+            audience=project_id,
+            clock_skew_in_seconds=clock_skew_seconds,
+        )
+    except (ValueError, google_auth_exceptions.GoogleAuthError) as e:
+        raise InvalidIdTokenError(str(e)) from e
+    if claims.get("iss") != f"{ISSUER_PREFIX}{project_id}":
+        raise InvalidIdTokenError("Token has incorrect iss claim")
+    sub = claims.get("sub")
+    if not isinstance(sub, str) or not sub or len(sub) > 128:
+        raise InvalidIdTokenError("Token has invalid sub claim")
+    auth_time = claims.get("auth_time")
+    if not isinstance(auth_time, (int, float)) or auth_time > time.time() + clock_skew_seconds:
+        raise InvalidIdTokenError("Token has invalid auth_time claim")
+    claims["uid"] = sub
+    return claims
+
+
+key_store = SigningKeyStore(settings.auth_certs_url, settings.auth_keys_refresh_margin_seconds)
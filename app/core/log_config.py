@@ -0,0 +1,180 @@
+"""Logging pipeline for the ``app`` loggers: sampled, queued, written as JSON by a background thread.
+
+Request handlers only build a record and put it on a bounded queue; formatting
+and the stdout write happen on the QueueListener thread. INFO/DEBUG records of
+high-volume loggers are sampled (LOG_SAMPLE_RATES) by a filter on those loggers,
+before any handler runs; WARNING and above are always kept. Process-wide logging
+settings are left alone.
+"""
+
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from app.config import settings
+
+APP_LOGGER = "app"
+
+_listener: QueueListener | None = None
+_handler: "DroppingQueueHandler | None" = None
+_sampler: "SamplingFilter | None" = None
+_sampled_loggers: list[logging.Logger] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (fields understood by Cloud Logging: severity, message, time)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of records below WARNING per logger. ``rates`` maps a logger
+    name to a rate in [0, 1]; it applies to that logger and its children
+    (the most specific name wins). Loggers without a rate keep everything.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved: dict[str, float] = {}
+        self.sampled_out = 0
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller: when the queue is full the record
+    is dropped and counted. Only the message is rendered on the calling thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may change later); traceback text only when present.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+def _app_loggers() -> list[logging.Logger]:
+    """The ``app`` logger and its descendants created so far."""
+    logging.getLogger(APP_LOGGER)
+    prefix = APP_LOGGER + "."
+    return [
+        logger
+        for name, logger in list(logging.Logger.manager.loggerDict.items())
+        if isinstance(logger, logging.Logger) and (name == APP_LOGGER or name.startswith(prefix))
+    ]
+
+
+def configure_logging() -> None:
+    """
+    Route the ``app`` loggers through the sampled queue pipeline (call once at startup,
+    after the app modules have created their loggers: the sampling filter is added
+    to each existing ``app.*`` logger with a rate below 1).
+    Settings: LOG_LEVEL, LOG_FORMAT (json/text), LOG_QUEUE_SIZE, LOG_SAMPLE_RATES.
+    """
+    global _listener, _handler, _sampler
+    if _listener is not None:
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.log_format == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    listener = QueueListener(handler.queue, stream, respect_handler_level=True)
+    listener.start()
+
+    sampler = SamplingFilter(settings.log_sample_rates)
+    for logger in _app_loggers():
+        if sampler._rate(logger.name) < 1.0:
+            logger.addFilter(sampler)
+            _sampled_loggers.append(logger)
+    app_logger = logging.getLogger(APP_LOGGER)
+    app_logger.setLevel(settings.log_level.upper())
+    app_logger.addHandler(handler)
+    app_logger.propagate = False
+    _listener, _handler, _sampler = listener, handler, sampler
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread (app shutdown)."""
+    global _listener, _handler, _sampler
+    listener, handler, sampler = _listener, _handler, _sampler
+    _listener = _handler = _sampler = None
+    if sampler is not None:
+        for logger in _sampled_loggers:
+            logger.removeFilter(sampler)
+        _sampled_loggers.clear()
+    if handler is not None:
+        app_logger = logging.getLogger(APP_LOGGER)
+        app_logger.removeHandler(handler)
+        app_logger.propagate = True
+    if listener is not None:
+        listener.stop()
+
+
+def get_logging_stats() -> dict[str, int]:
+    """Counters: records enqueued, dropped (queue full), sampled out, current queue depth."""
+    if _handler is None:
+        return {}
+    return {
+        "enqueued": _handler.enqueued,
+        "dropped": _handler.dropped,
+        "sampled_out": _sampler.sampled_out if _sampler is not None else 0,
+        "queue_depth": _handler.queue.qsize(),
+    }
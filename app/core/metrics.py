@@ -0,0 +1,258 @@
+"""Latency histograms (HTTP requests, storage operations, Firebase Auth calls) in Prometheus text format.
+
+Self-contained (no prometheus_client dependency): an observation is one bisect
+and two additions under an uncontended lock, cheap enough to leave on in production.
+"""
+
+import functools
+import inspect
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, TypeVar
+
+from app.config import settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; covers in-process cache hits (sub-ms) up to slow Google round trips.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Latency histogram with a fixed label set; one series per label-value tuple."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [count per bucket (+Inf last)..., sum, count]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        """Record one duration for the given label values (in labelnames order)."""
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def snapshot(self) -> dict[tuple[str, ...], list[float]]:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = (*self.buckets, math.inf)
+        for labels, series in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{label_str} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Histograms plus collectors that report stats snapshots as gauges at scrape time."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._histograms: list[Histogram] = []
+        self._collectors: list[tuple[str, str, Callable[[], Mapping[str, Any] | None]]] = []
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames)
+        self._histograms.append(histogram)
+        return histogram
+
+    def register_stats(
+        self, prefix: str, documentation: str, collect: Callable[[], Mapping[str, Any] | None]
+    ) -> None:
+        """Expose each numeric value of collect() as gauge ``<prefix>_<key>``."""
+        self._collectors.append((prefix, documentation, collect))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for prefix, documentation, collect in self._collectors:
+            for key, value in (collect() or {}).items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                lines.append(f"# HELP {name} {documentation} ({key}).")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(enabled=settings.metrics_enabled)
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+)
+STORAGE_OPERATION_SECONDS = registry.histogram(
+    "storage_operation_duration_seconds",
+    "Document storage operation latency (Firestore or local backend) by operation and outcome.",
+    ("operation", "backend", "outcome"),
+)
+AUTH_CALL_SECONDS = registry.histogram(
+    "firebase_auth_call_duration_seconds",
+    "Firebase Auth call latency (token verification, sign-in, user creation, key refresh).",
+    ("call", "outcome"),
+)
+
+
+class timer:
+    """
+    Context manager that observes the elapsed time with ``labels`` plus an
+    outcome label ("ok", or "error" if the block raised).
+    """
+
+    __slots__ = ("histogram", "labels", "_start")
+
+    def __init__(self, histogram: Histogram, *labels: str) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if registry.enabled:
+            # GeneratorExit: the consumer stopped iterating a timed async generator early.
+            outcome = "ok" if exc_type is None or exc_type is GeneratorExit else "error"
+            self.histogram.observe(time.perf_counter() - self._start, *self.labels, outcome)
+
+
+def timed(histogram: Histogram, *labels: str) -> Callable[[F], F]:
+    """
+    Decorator form of ``timer`` for sync functions, coroutines and async generators
+    (an async generator is timed from the first to the last item).
+    """
+
+    def decorate(func: F) -> F:
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def gen_wrapper(*args, **kwargs):
+                with timer(histogram, *labels):
+                    async for item in func(*args, **kwargs):
+                        yield item
+
+            return gen_wrapper  # type: ignore[return-value]
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timer(histogram, *labels):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(histogram, *labels):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+_PATH_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+def _route_template(scope) -> str:
+    """
+    Full path template of the matched route (e.g. ``/notes/{id}``), or "unmatched".
+
+    The route in scope may carry only its path inside an included router, so the
+    router prefix is recovered from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    params = scope.get("path_params") or {}
+    rendered = _PATH_PARAM.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+    path = scope.get("path", "")
+    if path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording HTTP_REQUEST_SECONDS per request. The route label is
+    the matched path template (e.g. ``/notes/{id}``), so note ids do not create series.
+    Timing ends when the response body is complete (streams included).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, scope["method"], _route_template(scope), status
+            )
@@ -0,0 +1,196 @@
+"""Negotiated response compression: Brotli when the ``brotli`` package is installed, else gzip.
+
+Bodies below RESPONSE_COMPRESSION_MIN_BYTES are sent as-is (compression would not
+pay for itself). Streamed bodies (NDJSON) are compressed chunk by chunk with a sync
+flush, so each chunk still reaches the client promptly; server-sent events are never
+compressed. Bodies larger than COMPRESSION_INLINE_MAX_BYTES are compressed in slices
+of that size, yielding to the event loop in between, so a large page never holds it
+for longer than one slice.
+"""
+
+import asyncio
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Content types worth compressing (prefix match).
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Must reach the client unbuffered, event by event.
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Content codings this install can produce, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Best supported coding for an Accept-Encoding header (q-values and ``*`` honored), or None."""
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[coding] = q
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = qualities.get(coding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def feed(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def feed(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").lower()
+    if "content-encoding" in headers or content_type.startswith(EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses per the request's Accept-Encoding.
+
+    Compressed responses get ``Content-Encoding``, ``Vary: Accept-Encoding`` and a
+    weak ETag (the bytes differ from the identity representation; the app's
+    If-None-Match check compares weakly, so 304s keep working).
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        inline_max_bytes: int = 0,
+    ) -> None:
+        """
+        :param minimum_size: Smaller (unstreamed) bodies are sent as-is.
+        :param inline_max_bytes: Larger bodies are compressed in slices of this size,
+            yielding to the event loop between slices (0 = in one step).
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.inline_max_bytes = inline_max_bytes
+
+    def _encoder(self, coding: str) -> _GzipEncoder | _BrotliEncoder:
+        if coding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def _encode(
+        self, encoder: _GzipEncoder | _BrotliEncoder, body: bytes, more_body: bool
+    ) -> bytes:
+        step = self.inline_max_bytes
+        parts: list[bytes] = []
+        start = 0
+        if step > 0:
+            while len(body) - start > step:
+                parts.append(encoder.feed(body[start : start + step]))
+                start += step
+                await asyncio.sleep(0)
+        tail = body[start:] if start else body
+        parts.append(encoder.chunk(tail) if more_body else encoder.finish(tail))
+        return b"".join(parts)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: dict | None = None
+        encoder: _GzipEncoder | _BrotliEncoder | None = None
+        passthrough = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is not None and message["type"] != "http.response.body":
+                await send(start)
+                start = None
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is not None:
+                data = await self._encode(encoder, body, more_body)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            # First body message: decide for the whole response.
+            assert start is not None
+            headers = MutableHeaders(scope=start)
+            compressible = start["status"] not in (204, 304) and _compressible(headers)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if not compressible or (not more_body and len(body) < self.minimum_size):
+                passthrough = True
+                await send(start)
+                start = None
+                await send(message)
+                return
+            encoder = self._encoder(coding)
+            headers["Content-Encoding"] = coding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            data = await self._encode(encoder, body, more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(data))
+            await send(start)
+            start = None
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,55 @@
+"""Fast JSON responses: orjson when available (JSON_BACKEND), stdlib json otherwise."""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger("app.core.responses")
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode values the JSON backends do not handle natively (e.g. datetime subclasses)."""
+    if isinstance(obj, datetime):
+        text = obj.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_stdlib(content: Any) -> bytes:
+    return json.dumps(
+        content, default=_json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _dumps_orjson(content: Any) -> bytes:
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_UTC_Z)
+
+
+def _select_dumps() -> Callable[[Any], bytes]:
+    if settings.json_backend == "orjson":
+        if orjson is not None:
+            return _dumps_orjson
+        logger.warning("JSON_BACKEND=orjson but orjson is not installed; using stdlib json")
+    return _dumps_stdlib
+
+
+dumps = _select_dumps()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured backend (see ``dumps``)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,71 @@
+"""Single-flight: concurrent identical calls share one execution and its result.
+
+The first caller for a key (the leader) runs the call itself; callers that
+arrive with the same key while it is in flight wait for the leader's outcome
+instead of starting their own. Results (and exceptions) are shared, so callers
+must treat them as read-only. Uncontended calls cost one dict lookup and a
+future: no task is spawned and no extra event loop turn is taken.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls per key; ``enabled=False`` runs every call directly."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0  # executions started
+        self.merged = 0  # callers that joined an execution in flight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Result of ``fn()``, shared with concurrent callers using the same key.
+        If the leader is cancelled (client disconnect), its waiters start over and
+        one of them becomes the new leader.
+        :param key: Identifies the call (include every argument that affects the result).
+        :param fn: Starts the call; invoked only by the leader.
+        """
+        if not self.enabled:
+            return await fn()
+        while (shared := self._calls.get(key)) is not None:
+            self.merged += 1
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved, even if nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def discard(self, match: Callable[[Any], bool]) -> None:
+        """
+        Stop sharing in-flight calls whose key matches (e.g. after a write), so
+        later callers start a fresh call; current waiters still get their result.
+        """
+        for key in [key for key in self._calls if match(key)]:
+            del self._calls[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": len(self._calls), "calls": self.calls, "merged": self.merged}
@@ -0,0 +1,120 @@
+"""Cold-start support: lazy imports of heavy SDK modules and a startup timing report.
+
+With STARTUP_LAZY_IMPORTS (default on), ``lazy_import`` returns a placeholder that
+imports the module on first attribute access, so importing ``app.main`` (and
+serving /health) does not pay for firebase_admin, Firestore/gRPC and google.auth.
+The lifespan then loads them during warm-up, concurrently with the network phases
+(see ``StartupReport.warm_up``), before the instance accepts traffic.
+"""
+
+import asyncio
+import importlib
+import logging
+import sys
+import time
+import types
+from collections.abc import Awaitable
+from typing import Any
+
+from app import STARTED_AT
+from app.config import settings
+
+logger = logging.getLogger("app.core.startup")
+
+
+class StartupReport:
+    """Durations of the startup phases: app import, lazy module loads, warm-up phases."""
+
+    def __init__(self) -> None:
+        self.import_seconds: float | None = None
+        self.lazy_imports: dict[str, float] = {}
+        self.warmup: dict[str, dict[str, Any]] = {}
+        self.warmup_seconds: float | None = None
+        self.ready_seconds: float | None = None
+
+    def mark_imported(self) -> None:
+        """End of the import phase (call at the end of app.main)."""
+        self.import_seconds = time.perf_counter() - STARTED_AT
+
+    def record_import(self, name: str, seconds: float) -> None:
+        self.lazy_imports[name] = seconds
+
+    async def _phase(self, name: str, awaitable: Awaitable[Any]) -> None:
+        start = time.perf_counter()
+        try:
+            await awaitable
+        except Exception as e:
+            self.warmup[name] = {"seconds": time.perf_counter() - start, "ok": False, "error": repr(e)}
+            raise
+        self.warmup[name] = {"seconds": time.perf_counter() - start, "ok": True}
+
+    async def warm_up(self, phases: dict[str, Awaitable[Any]]) -> None:
+        """
+        Run the warm-up phases concurrently and record each one's duration.
+        Waits for all of them; then re-raises the first failure, if any.
+        """
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._phase(name, awaitable) for name, awaitable in phases.items()),
+            return_exceptions=True,
+        )
+        self.warmup_seconds = time.perf_counter() - start
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def mark_ready(self) -> None:
+        """End of startup (lifespan about to yield); logs the report."""
+        self.ready_seconds = time.perf_counter() - STARTED_AT
+        logger.info("Startup ready in %.3fs %s", self.ready_seconds, self.summary())
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "import_seconds": self.import_seconds,
+            "lazy_imports": dict(self.lazy_imports),
+            "warmup_seconds": self.warmup_seconds,
+            "warmup": {name: dict(phase) for name, phase in self.warmup.items()},
+            "ready_seconds": self.ready_seconds,
+        }
+
+
+startup_report = StartupReport()
+
+
+class _LazyModule(types.ModuleType):
+    """Placeholder that imports the real module on first attribute access."""
+
+    def _load(self) -> types.ModuleType:
+        name = self.__name__
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        if name not in startup_report.lazy_imports:
+            startup_report.record_import(name, time.perf_counter() - start)
+        # Later lookups hit the copied attributes directly (no __getattr__).
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+
+_lazy_modules: list[_LazyModule] = []
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Module ``name``, imported on first attribute access (STARTUP_LAZY_IMPORTS), or
+    right away if lazy imports are off or it is already loaded.
+    """
+    if not settings.startup_lazy_imports or name in sys.modules:
+        return importlib.import_module(name)
+    module = _LazyModule(name)
+    _lazy_modules.append(module)
+    return module
+
+
+def preload_lazy_modules() -> None:
+    """Import every lazily imported module not loaded yet (blocking; run on the executor)."""
+    for module in list(_lazy_modules):
+        if module.__name__ not in startup_report.lazy_imports:
+            module._load()
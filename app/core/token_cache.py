@@ -0,0 +1,78 @@
+"""In-process TTL/LRU cache of verified Firebase ID tokens."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.config import settings
+
+
+class TokenCache:
+    """
+    Bounded cache of decoded ID tokens keyed by SHA-256 of the raw token.
+
+    Each entry expires at the token's ``exp`` claim; when full, the least
+    recently used entry is evicted. Only accessed from the event loop.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Return decoded claims for token, or None on miss / expired entry."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, decoded = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return decoded
+
+    def put(self, token: str, decoded: dict[str, Any]) -> None:
+        """Cache decoded claims until the token's exp claim. Ignores tokens without exp."""
+        if self.max_size <= 0:
+            return
+        exp = decoded.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+        key = self._key(token)
+        self._entries[key] = (float(exp), decoded)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss/eviction counters and current size."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+token_cache = TokenCache(settings.token_cache_max_size)
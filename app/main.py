@@ -1,37 +1,143 @@
 """FastAPI application entry point."""
 
+import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 
 from app import __version__
 from app.config import settings
-from app.core.firebase import init_firebase, close_firebase
+from app.core.admission import (
+    OverloadedError,
+    limit_user_rate,
+    overloaded_handler,
+    storage_limiter,
+    user_rate_limiter,
+)
+from app.core.auth import token_verifications
+from app.core.executor import get_executor_stats, run_blocking, shutdown_executor
+from app.core.firebase import close_firebase, init_firebase, warm_up_firestore
+from app.core.http import close_http_client, init_http_client
+from app.core.log_config import configure_logging, get_logging_stats, shutdown_logging
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry
+from app.core.id_token import key_store
+from app.core.response_compression import CompressionMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.startup import preload_lazy_modules, startup_report
+from app.core.token_cache import token_cache
 from app.api.auth import router as auth_router
 from app.api.v1 import notes
+from app.services.note_cache import note_cache
+from app.services.note_events import note_events
+from app.services.note_firestore_service import note_reads
+from app.services.note_search import search_index
+from app.services.storage_backend import local_storage
+
+
+logger = logging.getLogger("app.main")
+
+
+async def _warm_up_firebase() -> None:
+    """Initialize Firebase on the executor (imports, credentials), then open the Firestore channel."""
+    await run_blocking(init_firebase)
+    if settings.startup_prewarm and local_storage is None:
+        try:
+            await warm_up_firestore(settings.startup_warmup_timeout_seconds)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Firestore warm-up failed (first request will connect): %r", e)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup and shutdown lifecycle."""
-    init_firebase()
+    """Startup and shutdown lifecycle. Warm-up phases run concurrently before serving."""
+    configure_logging()
+    await init_http_client()
+    phases = {"firebase": _warm_up_firebase()}
+    if settings.auth_local_verification:
+        phases["auth_keys"] = key_store.start()
+    if settings.startup_prewarm:
+        phases["modules"] = run_blocking(preload_lazy_modules)
+    await startup_report.warm_up(phases)
+    startup_report.mark_ready()
     yield
+    note_events.close()
+    await key_store.stop()
+    if local_storage is not None:
+        await local_storage.close()
     close_firebase()
+    await close_http_client()
+    shutdown_executor()
+    shutdown_logging()
 
 
 app = FastAPI(
     title=settings.app_name,
     version=__version__,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
 
+if settings.response_compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.response_compression_min_bytes,
+        gzip_level=settings.response_gzip_level,
+        brotli_quality=settings.response_brotli_quality,
+        inline_max_bytes=settings.compression_inline_max_bytes,
+    )
+if settings.metrics_enabled:
+    # Added last = outermost, so request latency includes compression.
+    app.add_middleware(MetricsMiddleware)
+    registry.register_stats("firebase_executor", "Firebase executor stats", get_executor_stats)
+    registry.register_stats("logging", "Log pipeline stats", get_logging_stats)
+    registry.register_stats("token_cache", "ID token cache stats", token_cache.stats)
+    registry.register_stats(
+        "note_cache", "Note list cache stats", note_cache.stats if note_cache is not None else dict
+    )
+    registry.register_stats("note_search", "Note search index stats", search_index.stats)
+    registry.register_stats("note_stream", "Note event stream stats", note_events.stats)
+    registry.register_stats("rate_limit", "Per-user rate limiter stats", user_rate_limiter.stats)
+    registry.register_stats(
+        "storage_limit", "Storage concurrency limiter stats", storage_limiter.stats
+    )
+    registry.register_stats("note_singleflight", "Coalesced note reads", note_reads.stats)
+    registry.register_stats(
+        "auth_singleflight", "Coalesced token verifications", token_verifications.stats
+    )
+
+app.add_exception_handler(OverloadedError, overloaded_handler)
 app.include_router(auth_router)
-app.include_router(notes.router, prefix="/notes", tags=["notes"])
+app.include_router(
+    notes.router, prefix="/notes", tags=["notes"], dependencies=[Depends(limit_user_rate)]
+)
 
 
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
-    return {"status": "ok", "version": __version__}
+    """Health check endpoint: component stats (executor, caches, limits, single-flight) and startup."""
+    return {
+        "status": "ok",
+        "version": __version__,
+        "executor": get_executor_stats(),
+        "token_cache": token_cache.stats(),
+        "note_cache": note_cache.stats() if note_cache is not None else None,
+        "note_search": search_index.stats(),
+        "rate_limit": user_rate_limiter.stats(),
+        "storage_limit": storage_limiter.stats(),
+        "singleflight": {"notes": note_reads.stats(), "auth": token_verifications.stats()},
+        "startup": startup_report.summary(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: request, storage and Firebase Auth latency histograms plus stats gauges."""
+    if not settings.metrics_enabled:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+startup_report.mark_imported()
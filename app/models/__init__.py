@@ -1,5 +1,29 @@
 """Pydantic models and schemas for request/response."""
 
-from app.models.note import NoteCreate, NoteResponse, NoteUpdate
+from app.models.note import (
+    NoteBatchGetRequest,
+    NoteBatchGetResponse,
+    NoteBatchRequest,
+    NoteBatchResponse,
+    NoteBatchResult,
+    NoteChangesResponse,
+    NoteCreate,
+    NoteResponse,
+    NoteSummary,
+    NoteTombstone,
+    NoteUpdate,
+)
 
-__all__ = ["NoteCreate", "NoteUpdate", "NoteResponse"]
+__all__ = [
+    "NoteCreate",
+    "NoteUpdate",
+    "NoteResponse",
+    "NoteSummary",
+    "NoteBatchRequest",
+    "NoteBatchResult",
+    "NoteBatchResponse",
+    "NoteBatchGetRequest",
+    "NoteBatchGetResponse",
+    "NoteTombstone",
+    "NoteChangesResponse",
+]
@@ -1,9 +1,11 @@
 """Pydantic models for Note (Firestore)."""
 
 from datetime import datetime
-from typing import Any
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.config import settings
 
 
 class NoteCreate(BaseModel):
@@ -22,6 +24,22 @@ class NoteUpdate(BaseModel):
     is_pinned: bool | None = None
 
 
+def to_datetime(v: Any) -> datetime | None:
+    """
+    Coerce Firestore timestamp-like to a plain ``datetime`` (not a subclass such as
+    DatetimeWithNanoseconds), so JSON encoders handle it natively.
+    """
+    if v is None or type(v) is datetime:
+        return v
+    if isinstance(v, datetime):
+        return datetime(
+            v.year, v.month, v.day, v.hour, v.minute, v.second, v.microsecond, v.tzinfo
+        )
+    if hasattr(v, "timestamp"):
+        return datetime.fromtimestamp(v.timestamp())
+    return v
+
+
 class NoteResponse(BaseModel):
     """Note as returned from API."""
 
@@ -37,10 +55,120 @@ class NoteResponse(BaseModel):
     @classmethod
     def coerce_datetime(cls, v: Any) -> datetime | None:
         """Coerce Firestore timestamp-like to datetime."""
-        if v is None:
-            return None
-        if isinstance(v, datetime):
-            return v
-        if hasattr(v, "timestamp"):
-            return datetime.fromtimestamp(v.timestamp())
-        return v
+        return to_datetime(v)
+
+
+class NoteSummary(BaseModel):
+    """Lightweight note for list screens (GET /notes?view=summary): no content."""
+
+    id: str
+    title: str
+    is_pinned: bool = False
+    excerpt: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+    @field_validator("created_at", "updated_at", mode="before")
+    @classmethod
+    def coerce_datetime(cls, v: Any) -> datetime | None:
+        """Coerce Firestore timestamp-like to datetime."""
+        return to_datetime(v)
+
+
+class NoteBatchCreate(BaseModel):
+    """Batch operation: create a note."""
+
+    op: Literal["create"]
+    data: NoteCreate
+
+
+class NoteBatchUpdate(BaseModel):
+    """Batch operation: partial update of a note."""
+
+    op: Literal["update"]
+    id: str = Field(..., min_length=1)
+    data: NoteUpdate
+
+
+class NoteBatchDelete(BaseModel):
+    """Batch operation: delete a note."""
+
+    op: Literal["delete"]
+    id: str = Field(..., min_length=1)
+
+
+NoteBatchOperation = Annotated[
+    NoteBatchCreate | NoteBatchUpdate | NoteBatchDelete, Field(discriminator="op")
+]
+
+
+class NoteBatchRequest(BaseModel):
+    """Payload for POST /notes:batch (committed atomically)."""
+
+    operations: list[NoteBatchOperation] = Field(
+        ..., min_length=1, max_length=settings.notes_batch_max_operations
+    )
+
+    @model_validator(mode="after")
+    def unique_ids(self) -> "NoteBatchRequest":
+        """Each note may be targeted by at most one update/delete per batch."""
+        ids = [op.id for op in self.operations if not isinstance(op, NoteBatchCreate)]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Each note id may appear at most once per batch")
+        return self
+
+
+class NoteBatchResult(BaseModel):
+    """Outcome of one batch operation (status is an HTTP-style code)."""
+
+    index: int
+    op: str
+    id: str | None = None
+    status: int
+    note: NoteResponse | None = None
+    error: str | None = None
+
+
+class NoteBatchResponse(BaseModel):
+    """Response for POST /notes:batch (results in request order)."""
+
+    results: list[NoteBatchResult]
+
+
+class NoteBatchGetRequest(BaseModel):
+    """Payload for POST /notes:batchGet."""
+
+    ids: list[str] = Field(..., min_length=1, max_length=settings.notes_batch_max_operations)
+
+
+class NoteBatchGetResponse(BaseModel):
+    """Response for POST /notes:batchGet: found notes (request order) and missing ids."""
+
+    notes: list[NoteResponse]
+    missing: list[str]
+
+
+class NoteTombstone(BaseModel):
+    """A deleted note in a delta sync response."""
+
+    id: str
+    deleted_at: datetime
+
+    @field_validator("deleted_at", mode="before")
+    @classmethod
+    def coerce_datetime(cls, v: Any) -> datetime | None:
+        """Coerce Firestore timestamp-like to datetime."""
+        return to_datetime(v)
+
+
+class NoteChangesResponse(BaseModel):
+    """
+    Response for GET /notes/changes: while has_more, pass next_cursor as ``cursor``;
+    then pass watermark as ``since`` on the next sync.
+    """
+
+    changes: list[NoteResponse]
+    deleted: list[NoteTombstone]
+    watermark: datetime
+    has_more: bool
+    next_cursor: str | None = None
@@ -1,5 +1,15 @@
 """Business logic and Firebase operations."""
 
-from app.services import auth_service, firestore_service, note_firestore_service
+from app.services import (
+    auth_service,
+    firestore_async_service,
+    note_firestore_service,
+    storage_backend,
+)
 
-__all__ = ["auth_service", "firestore_service", "note_firestore_service"]
+__all__ = [
+    "auth_service",
+    "firestore_async_service",
+    "note_firestore_service",
+    "storage_backend",
+]
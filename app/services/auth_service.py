@@ -1,16 +1,19 @@
 """Auth: register (Firebase Admin create_user) and login (Firebase REST signIn)."""
 
-import httpx
-
-from firebase_admin import auth
-
 from app.config import settings
+from app.core.executor import run_blocking
+from app.core.http import get_http_client
+from app.core.metrics import AUTH_CALL_SECONDS, timed
+from app.core.startup import lazy_import
+
+auth = lazy_import("firebase_admin.auth")
 
 FIREBASE_REST_SIGN_IN = "https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword"
 
 
+@timed(AUTH_CALL_SECONDS, "sign_in_with_password")
 async def _sign_in_with_password(email: str, password: str) -> dict:
-    """Call Firebase REST API signInWithPassword; returns response with idToken, etc."""
+    """Call Firebase REST API signInWithPassword (shared pooled client); returns idToken, etc."""
     if not settings.firebase_web_api_key:
         raise ValueError("FIREBASE_WEB_API_KEY is not set")
     url = f"{FIREBASE_REST_SIGN_IN}?key={settings.firebase_web_api_key}"
@@ -19,15 +22,15 @@ async def _sign_in_with_password(email: str, password: str) -> dict:
         "password": password,
         "returnSecureToken": True,
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await get_http_client().post(url, json=payload)
+    resp.raise_for_status()
+    data = resp.json()
     if "idToken" not in data:
         raise ValueError("Firebase did not return idToken")
     return data
 
 
+@timed(AUTH_CALL_SECONDS, "create_user")
 def register_user(email: str, password: str, display_name: str | None = None) -> str:
     """
     Create a new Firebase user via Admin SDK.
@@ -44,10 +47,10 @@ async def register_and_sign_in(
     email: str, password: str, display_name: str | None = None
 ) -> dict:
     """
-    Create user via Admin SDK, then sign in via REST to get idToken.
+    Create user via Admin SDK (on the Firebase executor), then sign in via REST to get idToken.
     :return: dict with id_token, refresh_token, uid, email, expires_in
     """
-    register_user(email, password, display_name)
+    await run_blocking(register_user, email, password, display_name)
     data = await _sign_in_with_password(email, password)
     return {
         "id_token": data["idToken"],
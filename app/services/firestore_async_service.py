@@ -0,0 +1,408 @@
+"""Generic Firestore operations on the asyncio client (non-blocking for async routes).
+
+With STORAGE_BACKEND=memory or sqlite every function delegates to
+``storage_backend.local_storage`` (same arguments and results) instead of Firestore.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.core.admission import limited, storage_limiter
+from app.core.firebase import firestore, get_firestore, get_firestore_async
+from app.core.metrics import STORAGE_OPERATION_SECONDS, timed
+from app.services.storage_backend import (
+    ChangeCallback,
+    _ensure_dict,
+    _normalize_order,
+    local_storage,
+)
+
+logger = logging.getLogger("app.services.firestore_async")
+
+T = TypeVar("T")
+
+# Firestore limit on writes per commit (batch or transaction).
+MAX_WRITES_PER_COMMIT = 500
+
+
+def _timed(operation: str):
+    """
+    Run the operation under the storage concurrency limit (STORAGE_MAX_IN_FLIGHT;
+    OverloadedError when no slot frees up) and record its latency, excluding the
+    wait for a slot, in STORAGE_OPERATION_SECONDS (backend from STORAGE_BACKEND).
+    """
+    time_it = timed(STORAGE_OPERATION_SECONDS, operation, settings.storage_backend)
+    return lambda func: limited(storage_limiter)(time_it(func))
+
+
+@dataclass(frozen=True)
+class WriteOp:
+    """
+    One write in a batch: kind is "set", "update" or "delete". Updates require the
+    document (NotFound fails the whole commit); deletes of missing documents are no-ops.
+    """
+
+    kind: str
+    collection: str
+    document_id: str
+    data: dict[str, Any] = field(default_factory=dict)
+    merge: bool = False
+
+
+def new_document_id(collection: str) -> str:
+    """Generate a new auto-ID for collection (no round trip)."""
+    if local_storage is not None:
+        return local_storage.new_document_id(collection)
+    return get_firestore_async().collection(collection).document().id
+
+
+def _check_commit_size(ops: Sequence[WriteOp]) -> None:
+    """ValueError if ops do not fit in one commit (MAX_WRITES_PER_COMMIT)."""
+    if len(ops) > MAX_WRITES_PER_COMMIT:
+        raise ValueError(f"At most {MAX_WRITES_PER_COMMIT} writes per commit, got {len(ops)}")
+
+
+def _apply_write(writer, client, op: WriteOp) -> None:
+    """Add op to a WriteBatch or Transaction."""
+    ref = client.collection(op.collection).document(op.document_id)
+    if op.kind == "set":
+        writer.set(ref, _ensure_dict(dict(op.data)), merge=op.merge)
+    elif op.kind == "update":
+        writer.update(ref, _ensure_dict(dict(op.data)))
+    elif op.kind == "delete":
+        writer.delete(ref)
+    else:
+        raise ValueError(f"Unknown write kind: {op.kind}")
+
+
+@_timed("set_document")
+async def set_document(
+    collection: str,
+    document_id: str,
+    data: dict[str, Any],
+    merge: bool = False,
+) -> str:
+    """
+    Set a document by ID. Creates or overwrites.
+    :param collection: Collection name.
+    :param document_id: Document ID.
+    :param data: Document data (dict or Pydantic model dict).
+    :param merge: If True, merge with existing; else overwrite.
+    :return: Document ID.
+    """
+    if local_storage is not None:
+        return await local_storage.set_document(collection, document_id, data, merge)
+    client = get_firestore_async()
+    ref = client.collection(collection).document(document_id)
+    payload = _ensure_dict(dict(data))
+    await ref.set(payload, merge=merge)
+    logger.info("set_document collection=%s id=%s", collection, document_id)
+    return document_id
+
+
+@_timed("add_document")
+async def add_document(collection: str, data: dict[str, Any]) -> str:
+    """
+    Add a new document with auto-generated ID.
+    :param collection: Collection name.
+    :param data: Document data.
+    :return: Generated document ID.
+    """
+    if local_storage is not None:
+        return await local_storage.add_document(collection, data)
+    client = get_firestore_async()
+    ref = client.collection(collection).document()
+    payload = _ensure_dict(dict(data))
+    await ref.set(payload)
+    logger.info("add_document collection=%s id=%s", collection, ref.id)
+    return ref.id
+
+
+@_timed("update_document")
+async def update_document(
+    collection: str,
+    document_id: str,
+    data: dict[str, Any],
+) -> None:
+    """
+    Update existing document (partial update). Fails if document does not exist.
+    :param collection: Collection name.
+    :param document_id: Document ID.
+    :param data: Fields to update.
+    """
+    if local_storage is not None:
+        await local_storage.update_document(collection, document_id, data)
+        return
+    client = get_firestore_async()
+    ref = client.collection(collection).document(document_id)
+    payload = _ensure_dict(dict(data))
+    await ref.update(payload)
+    logger.info("update_document collection=%s id=%s", collection, document_id)
+
+
+@_timed("get_documents")
+async def get_documents(
+    collection: str, document_ids: Sequence[str]
+) -> dict[str, dict[str, Any] | None]:
+    """
+    Get several documents by ID in one round trip (``get_all``).
+    :return: Mapping id -> document data with id, or None if not found.
+    """
+    if local_storage is not None:
+        return await local_storage.get_documents(collection, document_ids)
+    client = get_firestore_async()
+    refs = [client.collection(collection).document(doc_id) for doc_id in dict.fromkeys(document_ids)]
+    found: dict[str, dict[str, Any] | None] = {ref.id: None for ref in refs}
+    if refs:
+        async for snapshot in client.get_all(refs):
+            if snapshot.exists:
+                found[snapshot.id] = {**snapshot.to_dict(), "id": snapshot.id}
+    logger.info("get_documents collection=%s requested=%d", collection, len(refs))
+    return found
+
+
+@_timed("commit_writes")
+async def commit_writes(ops: Sequence[WriteOp]) -> None:
+    """
+    Commit writes atomically in one WriteBatch.
+    :raises ValueError: if there are more than MAX_WRITES_PER_COMMIT (nothing is written;
+        splitting would let readers see a version marker before all of its notes).
+    """
+    _check_commit_size(ops)
+    if local_storage is not None:
+        await local_storage.commit_writes(ops)
+        return
+    client = get_firestore_async()
+    batch = client.batch()
+    for op in ops:
+        _apply_write(batch, client, op)
+    await batch.commit()
+    logger.info("commit_writes count=%d", len(ops))
+
+
+@_timed("run_in_transaction")
+async def run_in_transaction(
+    collection: str,
+    read_ids: Sequence[str],
+    plan: Callable[[dict[Any, dict[str, Any] | None]], tuple[Sequence[WriteOp], T]],
+    extra_reads: Sequence[tuple[str, str]] = (),
+) -> T:
+    """
+    Read documents, plan writes from them and commit atomically.
+
+    ``plan(current)`` receives id -> document (or None) for ``read_ids`` in
+    ``collection``, and (collection, id) -> document for ``extra_reads`` in other
+    collections; it returns (writes, result) and may be called again if the
+    transaction is retried. Without reads the writes are committed as a plain batch.
+    :return: The ``result`` returned by the last call to plan.
+    :raises ValueError: if plan returns more than MAX_WRITES_PER_COMMIT writes.
+    """
+
+    def checked(current: dict[Any, dict[str, Any] | None]) -> tuple[Sequence[WriteOp], T]:
+        writes, result = plan(current)
+        _check_commit_size(writes)
+        return writes, result
+
+    if local_storage is not None:
+        return await local_storage.run_in_transaction(collection, read_ids, checked, extra_reads)
+    client = get_firestore_async()
+    if not read_ids and not extra_reads:
+        writes, result = checked({})
+        if writes:
+            await commit_writes(writes)
+        return result
+
+    keys: dict[str, Any] = {}  # document path -> key in ``current``
+    refs = []
+    for key in [*dict.fromkeys(read_ids), *dict.fromkeys(extra_reads)]:
+        ref = (
+            client.collection(collection).document(key)
+            if isinstance(key, str)
+            else client.collection(key[0]).document(key[1])
+        )
+        keys[ref.path] = key
+        refs.append(ref)
+
+    @firestore.async_transactional
+    async def _apply(transaction) -> T:
+        current: dict[Any, dict[str, Any] | None] = dict.fromkeys(keys.values())
+        async for snapshot in client.get_all(refs, transaction=transaction):
+            if snapshot.exists:
+                current[keys[snapshot.reference.path]] = {**snapshot.to_dict(), "id": snapshot.id}
+        writes, result = checked(current)
+        for op in writes:
+            _apply_write(transaction, client, op)
+        return result
+
+    result = await _apply(client.transaction())
+    logger.info("run_in_transaction collection=%s reads=%d", collection, len(refs))
+    return result
+
+
+@_timed("delete_document")
+async def delete_document(collection: str, document_id: str) -> None:
+    """
+    Delete a document.
+    :param collection: Collection name.
+    :param document_id: Document ID.
+    """
+    if local_storage is not None:
+        await local_storage.delete_document(collection, document_id)
+        return
+    client = get_firestore_async()
+    await client.collection(collection).document(document_id).delete()
+    logger.info("delete_document collection=%s id=%s", collection, document_id)
+
+
+@_timed("get_document")
+async def get_document(collection: str, document_id: str) -> dict[str, Any] | None:
+    """
+    Get a document by ID.
+    :return: Document data with id, or None if not found.
+    """
+    if local_storage is not None:
+        return await local_storage.get_document(collection, document_id)
+    client = get_firestore_async()
+    ref = client.collection(collection).document(document_id)
+    doc = await ref.get()
+    if not doc.exists:
+        logger.info("get_document not found collection=%s id=%s", collection, document_id)
+        return None
+    data = doc.to_dict()
+    data["id"] = doc.id
+    logger.info("get_document found collection=%s id=%s", collection, document_id)
+    return data
+
+
+@_timed("list_documents")
+async def list_documents(collection: str) -> list[dict[str, Any]]:
+    """
+    List all documents in a collection.
+    :return: List of documents (each with id in the dict).
+    """
+    if local_storage is not None:
+        return await local_storage.list_documents(collection)
+    client = get_firestore_async()
+    docs = [d async for d in client.collection(collection).stream()]
+    logger.info("list_documents collection=%s count=%d", collection, len(docs))
+    return [{"id": d.id, **d.to_dict()} for d in docs]
+
+
+@_timed("list_documents_where")
+async def list_documents_where(
+    collection: str,
+    field: str | None,
+    value: Any,
+    order_by: str | Sequence[str | tuple[str, bool]] | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+    start_after: dict[str, Any] | None = None,
+    select: Sequence[str] | None = None,
+    filters: Sequence[tuple[str, str, Any]] = (),
+) -> list[dict[str, Any]]:
+    """
+    List documents where field equals value (e.g. userId == uid); field=None
+    queries the whole collection (e.g. a per-user subcollection).
+
+    Optionally order by one or more fields (e.g. ``[("is_pinned", True), ("created_at", True)]``),
+    limit the result size and start after a cursor (dict of order_by field values).
+    ``select`` projects the returned fields server-side (only those fields are read).
+    ``filters`` adds further conditions as (field, op, value), e.g. ``("updated_at", ">", ts)``.
+    :return: List of documents (each with id in the dict).
+    """
+    return [
+        doc
+        async for doc in stream_documents_where(
+            collection, field, value, order_by, descending, limit, start_after, select, filters
+        )
+    ]
+
+
+@_timed("stream_documents_where")
+async def stream_documents_where(
+    collection: str,
+    field: str | None,
+    value: Any,
+    order_by: str | Sequence[str | tuple[str, bool]] | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+    start_after: dict[str, Any] | None = None,
+    select: Sequence[str] | None = None,
+    filters: Sequence[tuple[str, str, Any]] = (),
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Like list_documents_where, but yields documents as Firestore streams them
+    (memory stays constant regardless of result size).
+    """
+    if local_storage is not None:
+        async for doc in local_storage.stream_documents_where(
+            collection, field, value, order_by, descending, limit, start_after, select, filters
+        ):
+            yield doc
+        return
+    client = get_firestore_async()
+    orders = _normalize_order(order_by, descending)
+    logger.info(
+        "stream_documents_where collection=%s field=%s value=%s filters=%s order_by=%s limit=%s select=%s",
+        collection,
+        field,
+        value,
+        filters,
+        orders,
+        limit,
+        select,
+    )
+    query = client.collection(collection)
+    if field is not None:
+        query = query.where(field, "==", value)
+    for name, op, operand in filters:
+        query = query.where(name, op, operand)
+    if select is not None:
+        query = query.select(list(select))
+    for name, desc in orders:
+        direction = firestore.Query.DESCENDING if desc else firestore.Query.ASCENDING
+        query = query.order_by(name, direction=direction)
+    if start_after:
+        query = query.start_after(start_after)
+    if limit is not None:
+        query = query.limit(limit)
+    async for d in query.stream():
+        yield {"id": d.id, **d.to_dict()}
+
+
+def watch_documents_where(
+    collection: str, field: str, value: Any, callback: ChangeCallback
+) -> Callable[[], None]:
+    """
+    Listen for changes to documents where field == value (must be called on the event loop).
+
+    Firestore: a snapshot listener (``on_snapshot``) on the sync client; its thread
+    hands each change set to the event loop. The initial snapshot (all current
+    documents) is not reported. ``callback`` receives [(kind, document with id)],
+    kind is "added", "modified" or "removed".
+    :return: Function that stops the listener.
+    """
+    if local_storage is not None:
+        return local_storage.watch_documents_where(collection, field, value, callback)
+    loop = asyncio.get_running_loop()
+    initial = True
+
+    def on_snapshot(docs, changes, read_time) -> None:
+        nonlocal initial
+        if initial:
+            initial = False
+            return
+        events = [
+            (change.type.name.lower(), {"id": change.document.id, **(change.document.to_dict() or {})})
+            for change in changes
+        ]
+        if events and not loop.is_closed():
+            loop.call_soon_threadsafe(callback, events)
+
+    watch = get_firestore().collection(collection).where(field, "==", value).on_snapshot(on_snapshot)
+    logger.info("watch_documents_where collection=%s field=%s value=%s", collection, field, value)
+    return watch.unsubscribe
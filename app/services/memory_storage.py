@@ -0,0 +1,90 @@
+"""In-process storage backend (STORAGE_BACKEND=memory) with equality indexes."""
+
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, TypeVar
+
+from app.services.storage_backend import (
+    MISSING,
+    DocumentKey,
+    DocumentStore,
+    copy_value,
+    field_value,
+)
+
+T = TypeVar("T")
+
+
+class MemoryStorage(DocumentStore):
+    """
+    Documents in dicts per collection. The first ``field == value`` query on a
+    collection builds an index for that field (value -> ids), which every write
+    keeps up to date, so per-user queries touch only that user's documents.
+
+    All operations run synchronously on the event loop, so each one (including
+    transactions) is atomic without locks. Data is lost on restart.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._collections: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+        self._indexes: dict[str, dict[str, dict[Hashable, set[str]]]] = defaultdict(dict)
+
+    async def _run(self, fn: Callable[[], T], write: bool = False) -> T:
+        return fn()
+
+    def _load(self, collection: str, document_id: str) -> dict[str, Any] | None:
+        data = self._collections[collection].get(document_id)
+        return copy_value(data) if data is not None else None
+
+    def _commit(self, pending: dict[DocumentKey, dict[str, Any] | None]) -> None:
+        for (collection, document_id), data in pending.items():
+            docs = self._collections[collection]
+            old = docs.get(document_id)
+            for field, index in self._indexes[collection].items():
+                if old is not None:
+                    self._unindex(index, old, field, document_id)
+                if data is not None:
+                    self._index(index, data, field, document_id)
+            if data is None:
+                docs.pop(document_id, None)
+            else:
+                docs[document_id] = copy_value(data)
+
+    @staticmethod
+    def _index(index: dict[Hashable, set[str]], data: dict[str, Any], field: str, doc_id: str) -> None:
+        value = field_value(doc_id, data, field)
+        if isinstance(value, Hashable) and value is not MISSING:
+            index.setdefault(value, set()).add(doc_id)
+
+    @staticmethod
+    def _unindex(
+        index: dict[Hashable, set[str]], data: dict[str, Any], field: str, doc_id: str
+    ) -> None:
+        value = field_value(doc_id, data, field)
+        if isinstance(value, Hashable):
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del index[value]
+
+    def _scan(
+        self, collection: str, field: str | None = None, value: Any = None
+    ) -> Iterable[tuple[str, dict[str, Any]]]:
+        docs = self._collections[collection]
+        if field is None:
+            return list(docs.items())
+        if not isinstance(value, Hashable):
+            return [(i, d) for i, d in docs.items() if field_value(i, d, field) == value]
+        indexes = self._indexes[collection]
+        index = indexes.get(field)
+        if index is None:
+            index = indexes[field] = {}
+            for doc_id, data in docs.items():
+                self._index(index, data, field, doc_id)
+        return [(doc_id, docs[doc_id]) for doc_id in index.get(value, ())]
+
+    def stats(self) -> dict[str, int]:
+        """Document counts per collection."""
+        return {name: len(docs) for name, docs in self._collections.items()}
@@ -0,0 +1,119 @@
+"""Per-user cache of sorted notes (write-through from note_firestore_service).
+
+Each entry is tagged with the user's notes version marker; readers compare it
+with the marker in Firestore so entries stay coherent across instances.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Protocol
+
+from app.config import settings
+
+
+class NoteCacheBackend(Protocol):
+    """
+    Storage for per-user note lists. The in-process backend is the default;
+    a shared store (e.g. Redis) can implement the same async interface.
+    """
+
+    async def get(self, user_id: str) -> tuple[str, list[dict]] | None:
+        """Return (version, sorted notes) for the user, or None on miss."""
+        ...
+
+    async def set(self, user_id: str, version: str, notes: list[dict]) -> None:
+        """Store the user's complete, sorted note list at the given version."""
+        ...
+
+    async def update(
+        self, user_id: str, prev: str, version: str, fn: Callable[[list[dict]], list[dict]]
+    ) -> None:
+        """
+        Apply a write: if the entry is at ``prev`` (the version the write replaced),
+        replace it with fn(entry) at ``version``; else drop it. No-op on miss.
+        """
+        ...
+
+    async def delete(self, user_id: str) -> None:
+        """Drop the user's entry."""
+        ...
+
+    def stats(self) -> dict[str, float]:
+        """Hit/miss/eviction counters."""
+        ...
+
+
+class InMemoryNoteCache:
+    """In-process LRU cache with a per-entry TTL and a max number of users."""
+
+    def __init__(self, max_users: int, ttl_seconds: float) -> None:
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str, list[dict]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, user_id: str) -> tuple[str, list[dict]] | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, version, notes = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return version, notes
+
+    async def set(self, user_id: str, version: str, notes: list[dict]) -> None:
+        if self.max_users <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, version, notes)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def update(
+        self, user_id: str, prev: str, version: str, fn: Callable[[list[dict]], list[dict]]
+    ) -> None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        expires_at, cached_version, notes = entry
+        if cached_version != prev:
+            del self._entries[user_id]
+            return
+        self._entries[user_id] = (expires_at, version, fn(notes))
+
+    async def delete(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_users": self.max_users,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def create_note_cache() -> NoteCacheBackend | None:
+    """Build the cache backend selected by NOTE_CACHE_BACKEND (None if disabled)."""
+    if not settings.note_cache_enabled:
+        return None
+    if settings.note_cache_backend == "memory":
+        return InMemoryNoteCache(settings.note_cache_max_users, settings.note_cache_ttl_seconds)
+    raise ValueError(f"Unknown NOTE_CACHE_BACKEND: {settings.note_cache_backend}")
+
+
+note_cache = create_note_cache()
@@ -0,0 +1,138 @@
+"""Fan-out of note change events to a user's open streams (GET /notes/stream).
+
+One storage listener per user (``note_firestore_service.watch_notes``: a Firestore
+snapshot listener, or the local backend's watcher) feeds every connection of that
+user. It starts with the first connection and stops with the last. Each connection
+has a bounded queue; a client that falls behind is dropped (it receives an
+"overflow" event and should resync with GET /notes/changes).
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from app.config import settings
+from app.services.note_firestore_service import watch_notes
+
+logger = logging.getLogger("app.services.note_events")
+
+# Event kinds: "upsert" (data: note), "delete" (data: {"id"}), plus the terminal
+# "overflow" (subscriber was too slow) and "closed" (server shutting down).
+NoteEvent = tuple[str, dict[str, Any]]
+
+OVERFLOW: NoteEvent = ("overflow", {})
+CLOSED: NoteEvent = ("closed", {})
+
+
+class NoteSubscription:
+    """One connection's bounded event queue."""
+
+    def __init__(self, user_id: str, queue_size: int) -> None:
+        self.user_id = user_id
+        self._queue: asyncio.Queue[NoteEvent] = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def _deliver(self, event: NoteEvent) -> bool:
+        """Queue an event; False if the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def _close(self, final: NoteEvent) -> None:
+        """Discard pending events and queue ``final`` as the last one."""
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(final)
+
+    async def get(self, timeout: float | None = None) -> NoteEvent | None:
+        """Next event, or None if nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class NoteEventHub:
+    """Per-user subscriber sets sharing one storage listener per user."""
+
+    def __init__(
+        self,
+        watch: Callable[[str, Callable[[list[tuple[str, dict]]], None]], Callable[[], None]],
+        queue_size: int,
+    ) -> None:
+        """
+        :param watch: watch(user_id, callback) starts a listener, returns its stop function.
+        :param queue_size: Max pending events per connection before it is dropped.
+        """
+        self._watch = watch
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[NoteSubscription]] = {}
+        self._listeners: dict[str, Callable[[], None]] = {}
+        self.published = 0
+        self.dropped_slow = 0
+
+    def subscribe(self, user_id: str) -> NoteSubscription:
+        """Register a connection; the user's listener starts with the first one."""
+        subscription = NoteSubscription(user_id, self.queue_size)
+        subscribers = self._subscribers.setdefault(user_id, set())
+        subscribers.add(subscription)
+        if user_id not in self._listeners:
+            try:
+                self._listeners[user_id] = self._watch(
+                    user_id, lambda changes: self._publish(user_id, changes)
+                )
+            except Exception:
+                self._discard(subscription)
+                raise
+        return subscription
+
+    def unsubscribe(self, subscription: NoteSubscription) -> None:
+        """Remove a connection; the user's listener stops with the last one."""
+        self._discard(subscription)
+
+    def _discard(self, subscription: NoteSubscription) -> None:
+        user_id = subscription.user_id
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[user_id]
+            stop = self._listeners.pop(user_id, None)
+            if stop is not None:
+                stop()
+
+    def _publish(self, user_id: str, changes: list[tuple[str, dict]]) -> None:
+        """Listener callback (on the event loop): fan storage changes out to the user's connections."""
+        events = [("delete" if kind == "removed" else "upsert", doc) for kind, doc in changes]
+        for subscription in list(self._subscribers.get(user_id, ())):
+            for event in events:
+                if not subscription._deliver(event):
+                    self.dropped_slow += 1
+                    logger.warning("Dropping slow note stream user_id=%s", user_id)
+                    subscription._close(OVERFLOW)
+                    self._discard(subscription)
+                    break
+        self.published += len(events)
+
+    def close(self) -> None:
+        """End every stream and stop all listeners (app shutdown)."""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription._close(CLOSED)
+                self._discard(subscription)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "users": len(self._subscribers),
+            "connections": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "dropped_slow": self.dropped_slow,
+        }
+
+
+note_events = NoteEventHub(watch_notes, settings.note_stream_queue_size)
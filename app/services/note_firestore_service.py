@@ -1,79 +1,931 @@
-"""Note CRUD using Firestore (write and read), scoped by user_id."""
+"""Note CRUD using Firestore (write and read), scoped by user_id. All operations are async."""
 
-from datetime import datetime
+import asyncio
+import base64
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
 
-from app.models.note import NoteCreate, NoteUpdate
-from app.services.firestore_service import (
-    add_document,
-    delete_document,
+from app.config import settings
+from app.core.singleflight import SingleFlight
+
+from app.models.note import (
+    NoteBatchCreate,
+    NoteBatchDelete,
+    NoteBatchOperation,
+    NoteBatchUpdate,
+    NoteCreate,
+    NoteUpdate,
+)
+from app.services.firestore_async_service import (
+    MAX_WRITES_PER_COMMIT,
+    WriteOp,
     get_document,
+    get_documents,
     list_documents_where,
-    update_document,
+    new_document_id,
+    run_in_transaction,
+    stream_documents_where,
+    watch_documents_where,
+)
+from app.services.note_cache import note_cache
+from app.services.note_search import (
+    UserSearchIndex,
+    decode_search_cursor,
+    encode_search_cursor,
+    search_index,
 )
+from app.services.storage_backend import evaluate_query
+from app.utils.compression import available_codecs, compress, decompress
+
+logger = logging.getLogger("app.services.notes")
+
+T = TypeVar("T")
 
 COLLECTION = "notes"
 USER_ID_FIELD = "user_id"
 
+# Large content is stored compressed: content_z holds the bytes, content_encoding
+# the codec ("identity" = plain text in content). Both are removed on read (_inflate).
+CONTENT_Z_FIELD = "content_z"
+CONTENT_ENCODING_FIELD = "content_encoding"
+IDENTITY = "identity"
+
+# Per-user metadata doc (users/{uid}); notes_version changes on every note write.
+USER_META_COLLECTION = "users"
+VERSION_FIELD = "notes_version"
+INITIAL_VERSION = "0"
+
+# NOTES_LAYOUT. "subcollection": a user's notes live in users/{uid}/notes, so the
+# path is the ownership check and lists scan one collection. "dual" (migration):
+# writes go to the subcollection (a note still in the global collection is moved
+# there first), reads cover both; note_migration moves the rest.
+LAYOUT_GLOBAL = "global"
+LAYOUT_DUAL = "dual"
+LAYOUT_SUBCOLLECTION = "subcollection"
+LAYOUTS = (LAYOUT_GLOBAL, LAYOUT_DUAL, LAYOUT_SUBCOLLECTION)
+if settings.notes_layout not in LAYOUTS:
+    raise ValueError(f"Unknown NOTES_LAYOUT: {settings.notes_layout}")
+LAYOUT = settings.notes_layout
+
+# Deleted notes leave a tombstone (same id) for delta sync; expire_at can drive a
+# Firestore TTL policy. Index: user_id ASC, deleted_at ASC.
+TOMBSTONE_COLLECTION = "note_tombstones"
+# Delta sync order. Index on notes: user_id ASC, updated_at ASC, __name__ ASC.
+CHANGES_ORDER = [("updated_at", False), ("__name__", False)]
+TOMBSTONES_ORDER = [("deleted_at", False), ("__name__", False)]
+# Event kinds in changes cursors (as in the response: "changes", "deleted"); they
+# are part of the merge order, so on equal timestamps notes sort before tombstones.
+CHANGES_KIND_NOTE = "c"
+CHANGES_KIND_DELETE = "d"
+CHANGES_KINDS = (CHANGES_KIND_NOTE, CHANGES_KIND_DELETE)
+
+# Pinned first, then newest first; document id as a stable tiebreak for cursors.
+# Requires a composite index: user_id ASC, is_pinned DESC, created_at DESC, __name__ DESC
+# (subcollection layout: the same without user_id).
+LIST_ORDER = [("is_pinned", True), ("created_at", True), ("__name__", True)]
+
+# Fields read for view="summary" (projection; content is never downloaded).
+SUMMARY_FIELDS = ["title", "is_pinned", "excerpt", "created_at", "updated_at"]
+
+_MIN_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc)
+
+# Concurrent identical reads (same user and arguments) share one backend call.
+# Keys are (operation, user_id, ...); writes discard the user's in-flight reads.
+note_reads = SingleFlight(settings.singleflight_enabled)
+
+
+def _select_codec() -> str | None:
+    """Codec for NOTE_COMPRESSION_CODEC (None when compression is off)."""
+    if settings.note_compression_min_bytes <= 0:
+        return None
+    codec = settings.note_compression_codec
+    if codec not in available_codecs():
+        logger.warning("NOTE_COMPRESSION_CODEC=%s is not available; using zlib", codec)
+        return "zlib"
+    return codec
+
+
+_CODEC = _select_codec()
+
+
+def _compress_content(payload: dict) -> dict:
+    """
+    Storage form of payload: content of at least NOTE_COMPRESSION_MIN_BYTES (UTF-8)
+    is moved into content_z when that is smaller. Writes that set content always
+    set content_encoding, so an update replaces a previously compressed body.
+    """
+    if "content" not in payload:
+        return payload
+    stored = dict(payload)
+    raw = payload["content"].encode("utf-8")
+    if _CODEC is not None and len(raw) >= settings.note_compression_min_bytes:
+        blob = compress(raw, _CODEC, settings.note_compression_level)
+        if len(blob) < len(raw):
+            stored.update({"content": "", CONTENT_Z_FIELD: blob, CONTENT_ENCODING_FIELD: _CODEC})
+            return stored
+    stored.update({CONTENT_Z_FIELD: b"", CONTENT_ENCODING_FIELD: IDENTITY})
+    return stored
+
+
+def _inflate(doc: dict) -> dict:
+    """Restore content of a stored note (in place) and drop the compression fields."""
+    encoding = doc.pop(CONTENT_ENCODING_FIELD, IDENTITY)
+    blob = doc.pop(CONTENT_Z_FIELD, None)
+    if encoding != IDENTITY and blob:
+        doc["content"] = decompress(bytes(blob), encoding).decode("utf-8")
+    return doc
+
+
+async def _compress_all(payloads: list[dict]) -> list[dict]:
+    """
+    _compress_content of each payload, yielding to the event loop whenever the
+    content handled since the last yield exceeds COMPRESSION_INLINE_MAX_BYTES
+    (a single note is bounded by the API's content limit).
+    """
+    budget = settings.compression_inline_max_bytes
+    stored: list[dict] = []
+    done = 0
+    for payload in payloads:
+        size = len(payload.get("content", "")) if _CODEC is not None else 0
+        if budget > 0 and done and done + size > budget:
+            await asyncio.sleep(0)
+            done = 0
+        stored.append(_compress_content(payload))
+        done += size
+    return stored
+
+
+async def _inflate_all(docs: list[dict]) -> list[dict]:
+    """
+    _inflate each document (in place), yielding to the event loop whenever the
+    compressed content handled since the last yield exceeds COMPRESSION_INLINE_MAX_BYTES.
+    """
+    budget = settings.compression_inline_max_bytes
+    done = 0
+    for doc in docs:
+        size = len(doc.get(CONTENT_Z_FIELD) or b"")
+        if budget > 0 and done and done + size > budget:
+            await asyncio.sleep(0)
+            done = 0
+        _inflate(doc)
+        done += size
+    return docs
+
 
 def _timestamp() -> datetime:
-    return datetime.utcnow()
+    return datetime.now(timezone.utc)
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex
+
+
+def _version_write(user_id: str, version: str) -> WriteOp:
+    """Write that bumps the user's notes version marker (committed with the note write)."""
+    return WriteOp(
+        "set",
+        USER_META_COLLECTION,
+        user_id,
+        {VERSION_FIELD: version, "notes_updated_at": _timestamp()},
+        merge=True,
+    )
+
+
+def _meta_key(user_id: str) -> tuple[str, str]:
+    """run_in_transaction extra read of the user's meta document (version marker)."""
+    return (USER_META_COLLECTION, user_id)
+
+
+def _version_of(meta: dict | None) -> str:
+    return str((meta or {}).get(VERSION_FIELD, INITIAL_VERSION))
+
+
+def _tombstone_write(user_id: str, note_id: str) -> WriteOp:
+    """Tombstone for a deleted note (committed with the delete)."""
+    deleted_at = _timestamp()
+    return WriteOp(
+        "set",
+        TOMBSTONE_COLLECTION,
+        note_id,
+        {
+            USER_ID_FIELD: user_id,
+            "deleted_at": deleted_at,
+            "expire_at": deleted_at + timedelta(days=settings.note_tombstone_retention_days),
+        },
+    )
 
 
-def create_note(user_id: str, data: NoteCreate) -> str:
+async def get_notes_version(user_id: str) -> str:
     """
-    Create a new note for the given user. Auto-generates ID and timestamps.
-    :return: Document ID.
+    Current notes version marker for the user (one small document read, shared
+    by concurrent callers). Changes on every create/update/delete; INITIAL_VERSION
+    if never written.
+    """
+
+    async def read() -> str:
+        return _version_of(await get_document(USER_META_COLLECTION, user_id))
+
+    return await note_reads.do(("version", user_id), read)
+
+
+def _sort_key(doc: dict) -> tuple:
+    """LIST_ORDER as a Python sort key (sort with reverse=True)."""
+    return (bool(doc.get("is_pinned", False)), doc.get("created_at") or _MIN_TIMESTAMP, doc["id"])
+
+
+def _page(
+    notes: list[dict], limit: int | None, start_after: dict | None
+) -> tuple[list[dict], str | None]:
+    """Slice a sorted (cached) note list the same way the Firestore query pages it."""
+    start = 0
+    if start_after is not None:
+        created_at = start_after["created_at"] or _MIN_TIMESTAMP
+        key = (start_after["is_pinned"], created_at, start_after["__name__"])
+        lo, hi = 0, len(notes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _sort_key(notes[mid]) < key:
+                hi = mid
+            else:
+                lo = mid + 1
+        start = lo
+    end = len(notes) if limit is None else start + limit
+    page = notes[start:end]
+    next_cursor = encode_cursor(page[-1]) if page and end < len(notes) else None
+    return page, next_cursor
+
+
+def _forget_reads(user_id: str) -> None:
+    """After a write: reads started before it are no longer shared with new callers."""
+    note_reads.discard(lambda key: key[1] == user_id)
+
+
+async def _cache_write(
+    user_id: str,
+    prev: str,
+    version: str,
+    upserted: Sequence[dict] = (),
+    removed: Sequence[str] = (),
+) -> None:
     """
+    Apply a committed write to the user's cached list (keeping LIST_ORDER) and
+    search index. ``prev`` is the version marker the write replaced (read in its
+    transaction): an entry at another version missed a write from elsewhere and
+    is dropped instead of being moved to ``version``.
+    """
+    _forget_reads(user_id)
+    search_index.apply(user_id, prev, version, upserted, removed)
+    if note_cache is None:
+        return
+    ids = {doc["id"] for doc in upserted}.union(removed)
+
+    def apply(notes: list[dict]) -> list[dict]:
+        updated = [n for n in notes if n["id"] not in ids]
+        if upserted:
+            updated.extend(upserted)
+            updated.sort(key=_sort_key, reverse=True)
+        return updated
+
+    await note_cache.update(user_id, prev, version, apply)
+
+
+def _owned_by(user_id: str):
+    """Ownership check of _on_note in the global collection: document belongs to user_id."""
+    return lambda doc: doc.get(USER_ID_FIELD) == user_id
+
+
+def _always(doc: dict) -> bool:
+    """Ownership check of _on_note in a user's subcollection (ownership is the path)."""
+    return True
+
+
+def user_notes_collection(user_id: str) -> str:
+    """Path of the user's notes subcollection (users/{uid}/notes); ValueError on a bad uid."""
+    if not user_id or "/" in user_id:
+        raise ValueError("Invalid user id")
+    return f"{USER_META_COLLECTION}/{user_id}/{COLLECTION}"
+
+
+def _notes_collection(user_id: str) -> str:
+    """Collection new notes of the user are written to in the configured layout."""
+    return COLLECTION if LAYOUT == LAYOUT_GLOBAL else user_notes_collection(user_id)
+
+
+def _sources(user_id: str) -> list[tuple[str, str | None, str | None]]:
+    """(collection, field, value) queries that together return the user's notes."""
+    legacy = (COLLECTION, USER_ID_FIELD, user_id)
+    if LAYOUT == LAYOUT_GLOBAL:
+        return [legacy]
+    current = (user_notes_collection(user_id), None, None)
+    # Dual: global first, so a note moved in between is seen twice (deduplicated), never missed.
+    return [current] if LAYOUT == LAYOUT_SUBCOLLECTION else [legacy, current]
+
+
+async def _query_notes(
+    user_id: str,
+    order_by: list[tuple[str, bool]],
+    limit: int | None = None,
+    start_after: dict | None = None,
+    select: list[str] | None = None,
+    filters: Sequence[tuple[str, str, Any]] = (),
+) -> list[dict]:
+    """
+    The user's notes in the configured layout, as one Firestore query (in dual
+    layout, both queries merged by id, the subcollection copy winning).
+    """
+    results = [
+        await list_documents_where(
+            collection,
+            field,
+            value,
+            order_by=order_by,
+            limit=limit,
+            start_after=start_after,
+            select=select,
+            filters=filters,
+        )
+        for collection, field, value in _sources(user_id)
+    ]
+    if len(results) == 1:
+        return results[0]
+    merged = {doc["id"]: doc for docs in results for doc in docs}
+    return evaluate_query(merged.items(), order_by, limit)
+
+
+async def _stream_notes(
+    user_id: str,
+    order_by: list[tuple[str, bool]] | None = None,
+    start_after: dict | None = None,
+    select: list[str] | None = None,
+) -> AsyncIterator[dict]:
+    """Streamed _query_notes (the dual layout reads both queries first)."""
+    sources = _sources(user_id)
+    if len(sources) > 1:
+        docs = await _query_notes(user_id, order_by or [], start_after=start_after, select=select)
+        for doc in docs:
+            yield doc
+        return
+    collection, field, value = sources[0]
+    async for doc in stream_documents_where(
+        collection, field, value, order_by=order_by, start_after=start_after, select=select
+    ):
+        yield doc
+
+
+async def _on_note(
+    user_id: str,
+    note_id: str,
+    action: Callable[[str, Callable[[dict], bool]], Awaitable[T | None]],
+) -> T | None:
+    """
+    Run ``action(collection, predicate)`` (a conditional write returning None when
+    nothing matched) on the note in the configured layout. Dual: on a miss in the
+    subcollection the note is moved there (if it is still in the global collection)
+    and the action retried, so every write lands in the subcollection.
+    """
+    if LAYOUT == LAYOUT_GLOBAL:
+        return await action(COLLECTION, _owned_by(user_id))
+    collection = user_notes_collection(user_id)
+    result = await action(collection, _always)
+    if result is None and LAYOUT == LAYOUT_DUAL:
+        await move_to_subcollections([note_id])
+        result = await action(collection, _always)
+    return result
+
+
+async def move_to_subcollections(note_ids: Sequence[str]) -> tuple[list[str], list[str]]:
+    """
+    Move notes from the global collection to their owners' subcollections (layout
+    migration), in one transaction: each note is copied and deleted atomically, so
+    it is always in exactly one place and concurrent updates are not lost.
+    Content is unchanged, so the version marker is not bumped.
+    :param note_ids: At most MAX_WRITES_PER_COMMIT / 2 ids; missing ones are ignored.
+    :return: (moved ids, skipped ids: documents without a valid user_id, left in place).
+    """
+    if len(note_ids) > MAX_WRITES_PER_COMMIT // 2:
+        raise ValueError(f"At most {MAX_WRITES_PER_COMMIT // 2} notes per move")
+
+    def plan(current: dict[str, dict | None]) -> tuple[list[WriteOp], tuple[list[str], list[str]]]:
+        writes: list[WriteOp] = []
+        moved: list[str] = []
+        skipped: list[str] = []
+        for note_id, doc in current.items():
+            if doc is None:
+                continue
+            owner = doc.get(USER_ID_FIELD)
+            if not isinstance(owner, str) or not owner or "/" in owner:
+                skipped.append(note_id)
+                continue
+            data = {k: v for k, v in doc.items() if k != "id"}
+            writes.append(WriteOp("set", user_notes_collection(owner), note_id, data))
+            writes.append(WriteOp("delete", COLLECTION, note_id))
+            moved.append(note_id)
+        return writes, (moved, skipped)
+
+    return await run_in_transaction(COLLECTION, note_ids, plan)
+
+
+def make_excerpt(content: str) -> str:
+    """Short plain-text preview of content (whitespace collapsed, cut at a word boundary)."""
+    text = " ".join(content.split())
+    limit = settings.note_excerpt_length
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0] or text[:limit]
+    return cut + "…"
+
+
+def _with_excerpt(payload: dict) -> dict:
+    """Add the stored excerpt when payload sets content."""
+    if settings.note_excerpt_length > 0 and "content" in payload:
+        payload["excerpt"] = make_excerpt(payload["content"])
+    return payload
+
+
+def _create_payload(user_id: str, data: NoteCreate) -> dict:
+    """Document data for a new note (owner, defaults, timestamps)."""
     payload = data.model_dump(exclude_none=True)
     # Ensure is_pinned is always present; default to False
     payload.setdefault("is_pinned", False)
     payload[USER_ID_FIELD] = user_id
     payload["created_at"] = _timestamp()
-    payload["updated_at"] = _timestamp()
-    return add_document(COLLECTION, payload)
+    payload["updated_at"] = payload["created_at"]
+    return _with_excerpt(payload)
 
 
-def get_note(user_id: str, note_id: str) -> dict | None:
-    """Get a single note by ID if it belongs to the user."""
-    doc = get_document(COLLECTION, note_id)
-    if doc is None or doc.get(USER_ID_FIELD) != user_id:
-        return None
-    return doc
+async def create_note(user_id: str, data: NoteCreate) -> dict:
+    """
+    Create a new note for the given user. Auto-generates ID and timestamps.
+    :return: The created note (with id), built from the written payload.
+    """
+    payload = _create_payload(user_id, data)
+    collection = _notes_collection(user_id)
+    doc_id = new_document_id(collection)
+    version = _new_version()
+    [stored] = await _compress_all([payload])
+
+    def plan(current: dict) -> tuple[list[WriteOp], str]:
+        writes = [WriteOp("set", collection, doc_id, stored), _version_write(user_id, version)]
+        return writes, _version_of(current[_meta_key(user_id)])
+
+    prev = await run_in_transaction(collection, [], plan, [_meta_key(user_id)])
+    note = {**payload, "id": doc_id}
+    await _cache_write(user_id, prev, version, upserted=[note])
+    return note
+
+
+async def get_note(user_id: str, note_id: str) -> dict | None:
+    """Get a single note by ID if it belongs to the user (one read shared by concurrent callers)."""
+
+    async def read() -> dict | None:
+        if LAYOUT == LAYOUT_GLOBAL:
+            doc = await get_document(COLLECTION, note_id)
+            if doc is None or doc.get(USER_ID_FIELD) != user_id:
+                return None
+            return (await _inflate_all([doc]))[0]
+        collection = user_notes_collection(user_id)
+        doc = await get_document(collection, note_id)
+        if doc is None and LAYOUT == LAYOUT_DUAL:
+            legacy = await get_document(COLLECTION, note_id)
+            if legacy is not None and legacy.get(USER_ID_FIELD) == user_id:
+                doc = legacy
+            else:
+                # Moved by the migration between the two reads (moves are one-way).
+                doc = await get_document(collection, note_id)
+        return (await _inflate_all([doc]))[0] if doc is not None else None
 
+    return await note_reads.do(("get_note", user_id, note_id), read)
 
-def list_notes(user_id: str) -> list[dict]:
-    """List all notes for the given user.
 
-    Ordering:
-    1. `is_pinned == True` notlar en üstte
-    2. Aynı pinned durumunda `created_at` en yeni en üstte
+def encode_cursor(doc: dict) -> str:
+    """Opaque cursor pointing just after ``doc`` in LIST_ORDER."""
+    created_at = doc.get("created_at")
+    raw = {
+        "p": bool(doc.get("is_pinned", False)),
+        "c": created_at.isoformat() if isinstance(created_at, datetime) else None,
+        "i": doc["id"],
+    }
+    return base64.urlsafe_b64encode(json.dumps(raw, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode an opaque cursor into start_after field values. Raises ValueError if malformed.
+    A note without created_at has ``"c": null``; null sorts below every timestamp.
     """
-    docs = list_documents_where(COLLECTION, USER_ID_FIELD, user_id)
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {
+            "is_pinned": bool(raw["p"]),
+            "created_at": datetime.fromisoformat(raw["c"]) if raw["c"] is not None else None,
+            "__name__": str(raw["i"]),
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def list_notes(
+    user_id: str,
+    limit: int | None = None,
+    cursor: str | None = None,
+    view: str = "full",
+    version: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """List a page of notes for the given user.
 
-    # Python tarafında iki seviyeli sıralama:
-    # - Önce is_pinned (True > False)
-    # - Sonra created_at (yeni > eski)
-    return sorted(
-        docs,
-        key=lambda d: (
-            bool(d.get("is_pinned", False)),
-            d.get("created_at") or _timestamp(),
-        ),
-        reverse=True,
+    Ordering (done by Firestore, see LIST_ORDER):
+    1. `is_pinned == True` notes first
+    2. Within the same pinned state, newest `created_at` first
+
+    Served from note_cache when the user's full list is cached at the current
+    version marker; a Firestore read that returns the complete list (first and
+    only page) fills the cache. Concurrent calls with the same arguments share
+    one read (note_reads).
+
+    :param limit: Max notes to return (None = all).
+    :param cursor: Opaque cursor from a previous page.
+    :param view: "full", or "summary" to read only SUMMARY_FIELDS (Firestore projection).
+    :param version: Version marker if already read (see get_notes_version).
+    :return: (notes, next_cursor); next_cursor is None on the last page.
+    """
+    start_after = decode_cursor(cursor) if cursor else None
+    return await note_reads.do(
+        ("list_notes", user_id, limit, cursor, view, version),
+        lambda: _list_notes(user_id, limit, start_after, view, version),
     )
 
 
-def update_note(user_id: str, note_id: str, data: NoteUpdate) -> None:
-    """Partial update of a note. No-op if note does not exist or does not belong to user."""
-    if get_note(user_id, note_id) is None:
-        raise ValueError("Note not found or access denied")
-    payload = data.model_dump(exclude_none=True)
+async def _list_notes(
+    user_id: str,
+    limit: int | None,
+    start_after: dict | None,
+    view: str,
+    version: str | None,
+) -> tuple[list[dict], str | None]:
+    """list_notes without coalescing."""
+    if note_cache is not None:
+        if version is None:
+            version = await get_notes_version(user_id)
+        cached = await note_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return _page(cached[1], limit, start_after)
+    docs = await _query_notes(
+        user_id,
+        LIST_ORDER,
+        limit=limit + 1 if limit is not None else None,
+        start_after=start_after,
+        select=SUMMARY_FIELDS if view == "summary" else None,
+    )
+    if limit is not None and len(docs) > limit:
+        docs = docs[:limit]
+        return await _inflate_all(docs), encode_cursor(docs[-1])
+    await _inflate_all(docs)
+    if note_cache is not None and start_after is None and view == "full":
+        await note_cache.set(user_id, version, list(docs))
+    return docs, None
+
+
+async def stream_notes(
+    user_id: str, cursor: str | None = None, view: str = "full"
+) -> AsyncIterator[dict]:
+    """
+    Yield all of the user's notes (after cursor) in LIST_ORDER straight from the
+    Firestore stream, without materializing the list.
+    """
+    start_after = decode_cursor(cursor) if cursor else None
+    async for doc in _stream_notes(
+        user_id,
+        LIST_ORDER,
+        start_after=start_after,
+        select=SUMMARY_FIELDS if view == "summary" else None,
+    ):
+        yield (await _inflate_all([doc]))[0]
+
+
+async def search_notes(
+    user_id: str, query: str, limit: int, cursor: str | None = None
+) -> tuple[list[dict], str | None]:
+    """
+    Full-text search over the user's note titles and content (see note_search).
+
+    Answered from the user's in-process index; it is built (from note_cache when
+    current, else one Firestore read) only when missing or behind the version marker.
+    :param limit: Max results to return.
+    :param cursor: Opaque cursor from a previous page of the same query.
+    :return: (note summaries ranked by relevance, pinned first on ties; next_cursor).
+    :raises ValueError: if the cursor is malformed.
+    """
+    offset = decode_search_cursor(cursor) if cursor else 0
+    version = await get_notes_version(user_id)
+    index = search_index.get(user_id, version)
+    if index is None:
+        index = UserSearchIndex(version)
+        cached = await note_cache.get(user_id) if note_cache is not None else None
+        if cached is not None and cached[0] == version:
+            for doc in cached[1]:
+                index.upsert(doc)
+        else:
+            async for doc in _stream_notes(user_id):
+                index.upsert((await _inflate_all([doc]))[0])
+        search_index.put(user_id, index)
+    ranked = index.search(query)
+    end = offset + limit
+    return ranked[offset:end], encode_search_cursor(end) if end < len(ranked) else None
+
+
+def watch_notes(user_id: str, callback: Callable[[list[tuple[str, dict]]], None]) -> Callable[[], None]:
+    """
+    Listen for changes to the user's notes (see watch_documents_where); callback
+    receives [(kind, note)] with kind "added", "modified" or "removed".
+    :return: Function that stops the listener.
+    """
+
+    def deliver(changes: list[tuple[str, dict]]) -> None:
+        # Inline: the callback is synchronous and holds one note per change (API max 50,000 chars).
+        callback([(kind, _inflate(doc)) for kind, doc in changes])
+
+    if LAYOUT == LAYOUT_GLOBAL:
+        return watch_documents_where(COLLECTION, USER_ID_FIELD, user_id, deliver)
+    stop = watch_documents_where(user_notes_collection(user_id), USER_ID_FIELD, user_id, deliver)
+    if LAYOUT == LAYOUT_SUBCOLLECTION:
+        return stop
+
+    def deliver_legacy(changes: list[tuple[str, dict]]) -> None:
+        # Dual: notes leave the global collection only by moving (deletes move first).
+        kept = [(kind, doc) for kind, doc in changes if kind != "removed"]
+        if kept:
+            deliver(kept)
+
+    stop_legacy = watch_documents_where(COLLECTION, USER_ID_FIELD, user_id, deliver_legacy)
+
+    def stop_both() -> None:
+        stop()
+        stop_legacy()
+
+    return stop_both
+
+
+async def update_note(user_id: str, note_id: str, data: NoteUpdate) -> dict:
+    """
+    Partial update of a note; the read (ownership check in the global layout,
+    current document for the response) and the write run in one transaction.
+    :return: The updated note.
+    :raises ValueError: if the note does not exist or does not belong to user.
+    """
+    payload = _with_excerpt(data.model_dump(exclude_none=True))
     payload["updated_at"] = _timestamp()
-    update_document(COLLECTION, note_id, payload)
+    version = _new_version()
+    [stored] = await _compress_all([payload])
+
+    async def update(collection: str, predicate: Callable[[dict], bool]) -> tuple[dict, str] | None:
+        def plan(current: dict) -> tuple[list[WriteOp], tuple[dict, str] | None]:
+            doc = current[note_id]
+            if doc is None or not predicate(doc):
+                return [], None
+            writes = [WriteOp("update", collection, note_id, stored), _version_write(user_id, version)]
+            return writes, ({**doc, **stored}, _version_of(current[_meta_key(user_id)]))
+
+        return await run_in_transaction(collection, [note_id], plan, [_meta_key(user_id)])
+
+    updated = await _on_note(user_id, note_id, update)
+    if updated is None:
+        raise ValueError("Note not found or access denied")
+    note, prev = updated
+    await _inflate_all([note])
+    await _cache_write(user_id, prev, version, upserted=[note])
+    return note
+
+
+async def delete_note(user_id: str, note_id: str) -> None:
+    """
+    Delete a note by ID if it belongs to the user, with a tombstone for delta sync
+    written atomically: the note and the version marker are read, checked and
+    deleted in one transaction.
+    """
+    version = _new_version()
+
+    async def delete(collection: str, predicate: Callable[[dict], bool]) -> str | None:
+        def plan(current: dict) -> tuple[list[WriteOp], str | None]:
+            doc = current[note_id]
+            if doc is None or not predicate(doc):
+                return [], None
+            writes = [
+                WriteOp("delete", collection, note_id),
+                _tombstone_write(user_id, note_id),
+                _version_write(user_id, version),
+            ]
+            return writes, _version_of(current[_meta_key(user_id)])
 
+        return await run_in_transaction(collection, [note_id], plan, [_meta_key(user_id)])
 
-def delete_note(user_id: str, note_id: str) -> None:
-    """Delete a note by ID if it belongs to the user."""
-    if get_note(user_id, note_id) is None:
+    prev = await _on_note(user_id, note_id, delete)
+    if prev is None:
         raise ValueError("Note not found or access denied")
-    delete_document(COLLECTION, note_id)
+    await _cache_write(user_id, prev, version, removed=[note_id])
+
+
+def _batch_write_count(operations: list[NoteBatchOperation]) -> int:
+    """Writes batch_notes commits at most: one per operation, a tombstone per delete, the version marker."""
+    deletes = sum(isinstance(op, NoteBatchDelete) for op in operations)
+    return len(operations) + deletes + 1
+
+
+async def batch_notes(user_id: str, operations: list[NoteBatchOperation]) -> list[dict]:
+    """
+    Apply mixed create/update/delete operations in one atomic commit.
+
+    Targets of updates/deletes are read in the same transaction (one ``get_all``;
+    in the dual layout they are first moved to the subcollection); operations on
+    missing or foreign notes are skipped and reported as 404.
+    :return: One result per operation: index, op, id, status, note, error.
+    :raises ValueError: if the batch does not fit in one commit (_batch_write_count).
+    """
+    writes = _batch_write_count(operations)
+    if writes > MAX_WRITES_PER_COMMIT:
+        raise ValueError(
+            f"Batch needs {writes} writes (a delete also writes a tombstone); "
+            f"at most {MAX_WRITES_PER_COMMIT} fit in one commit"
+        )
+    target_ids = [op.id for op in operations if not isinstance(op, NoteBatchCreate)]
+    collection = _notes_collection(user_id)
+    if LAYOUT == LAYOUT_DUAL:
+        ids = list(dict.fromkeys(target_ids))
+        for start in range(0, len(ids), MAX_WRITES_PER_COMMIT // 2):
+            await move_to_subcollections(ids[start : start + MAX_WRITES_PER_COMMIT // 2])
+    version = _new_version()
+    # Payloads are built and compressed once, off the (possibly retried) transaction.
+    payloads: dict[int, dict] = {}
+    for index, op in enumerate(operations):
+        if isinstance(op, NoteBatchCreate):
+            payloads[index] = _create_payload(user_id, op.data)
+        elif isinstance(op, NoteBatchUpdate):
+            payloads[index] = _with_excerpt(op.data.model_dump(exclude_none=True))
+            payloads[index]["updated_at"] = _timestamp()
+    stored_payloads = dict(zip(payloads, await _compress_all(list(payloads.values()))))
+
+    def plan(current: dict) -> tuple[list[WriteOp], tuple[list[dict], str]]:
+        writes: list[WriteOp] = []
+        results: list[dict] = []
+        for index, op in enumerate(operations):
+            if isinstance(op, NoteBatchCreate):
+                note_id = new_document_id(collection)
+                payload = payloads[index]
+                writes.append(WriteOp("set", collection, note_id, stored_payloads[index]))
+                results.append(
+                    {"index": index, "op": op.op, "id": note_id, "status": 201, "note": {**payload, "id": note_id}}
+                )
+                continue
+            doc = current.get(op.id)
+            if doc is None or doc.get(USER_ID_FIELD) != user_id:
+                results.append(
+                    {"index": index, "op": op.op, "id": op.id, "status": 404, "error": "Note not found"}
+                )
+                continue
+            if isinstance(op, NoteBatchUpdate):
+                stored = stored_payloads[index]
+                writes.append(WriteOp("update", collection, op.id, stored))
+                results.append(
+                    {"index": index, "op": op.op, "id": op.id, "status": 200, "note": {**doc, **stored}}
+                )
+            else:
+                writes.append(WriteOp("delete", collection, op.id))
+                writes.append(_tombstone_write(user_id, op.id))
+                results.append({"index": index, "op": op.op, "id": op.id, "status": 204})
+        if writes:
+            writes.append(_version_write(user_id, version))
+        return writes, (results, _version_of(current[_meta_key(user_id)]))
+
+    results, prev = await run_in_transaction(collection, target_ids, plan, [_meta_key(user_id)])
+    await _inflate_all([result["note"] for result in results if result["status"] == 200])
+    final: dict[str, dict | None] = {}  # note id -> last state written by the batch
+    for result in results:
+        if result["status"] in (200, 201):
+            final[result["id"]] = result["note"]
+        elif result["status"] == 204:
+            final[result["id"]] = None
+    if final:
+        await _cache_write(
+            user_id,
+            prev,
+            version,
+            upserted=[note for note in final.values() if note is not None],
+            removed=[note_id for note_id, note in final.items() if note is None],
+        )
+    return results
+
+
+async def batch_get_notes(user_id: str, note_ids: list[str]) -> tuple[list[dict], list[str]]:
+    """
+    Fetch several notes in one round trip (``get_all``).
+    :return: (notes owned by user in request order, ids that are missing or not owned).
+    """
+    if LAYOUT == LAYOUT_GLOBAL:
+        docs = await get_documents(COLLECTION, note_ids)
+    else:
+        collection = user_notes_collection(user_id)
+        docs = await get_documents(collection, note_ids)
+        if LAYOUT == LAYOUT_DUAL and (absent := [i for i, doc in docs.items() if doc is None]):
+            legacy = await get_documents(COLLECTION, absent)
+            docs.update((i, doc) for i, doc in legacy.items() if doc is not None)
+            # Moved by the migration between the two reads (moves are one-way).
+            if absent := [i for i in absent if docs.get(i) is None]:
+                docs.update(await get_documents(collection, absent))
+    notes: list[dict] = []
+    missing: list[str] = []
+    for note_id in dict.fromkeys(note_ids):
+        doc = docs.get(note_id)
+        if doc is None or doc.get(USER_ID_FIELD) != user_id:
+            missing.append(note_id)
+        else:
+            notes.append(doc)
+    return await _inflate_all(notes), missing
+
+
+def encode_changes_cursor(timestamp: datetime, kind: str, doc_id: str) -> str:
+    """Opaque cursor pointing just after an event of list_changes (see CHANGES_KINDS)."""
+    raw = {"t": timestamp.isoformat(), "k": kind, "i": doc_id}
+    return base64.urlsafe_b64encode(json.dumps(raw, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_changes_cursor(cursor: str) -> tuple[datetime, str, str]:
+    """(timestamp, kind, id) from a changes cursor. Raises ValueError if malformed."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        timestamp = datetime.fromisoformat(raw["t"])
+        kind, doc_id = str(raw["k"]), str(raw["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if kind not in CHANGES_KINDS or timestamp.tzinfo is None:
+        raise ValueError("Invalid cursor")
+    return timestamp, kind, doc_id
+
+
+async def list_changes(
+    user_id: str, since: datetime | None, limit: int, cursor: str | None = None
+) -> tuple[list[dict], list[dict], datetime, str | None]:
+    """
+    Notes created/updated and tombstones of notes deleted after ``since``, oldest first.
+
+    Both queries are ordered by (timestamp, id) and merged in the total order
+    (timestamp, kind, id), notes before tombstones on equal timestamps; at most
+    ``limit`` items are returned. When more are pending, the next page resumes
+    from the returned cursor (just after the last event, so events sharing its
+    timestamp are not skipped). Delivery is at-least-once: unless more items are
+    pending, the watermark trails the clock by NOTE_SYNC_SAFETY_LAG_SECONDS so
+    writes still in flight are picked up by the next call (clients apply changes
+    idempotently).
+    :param cursor: Cursor from a previous call with more pending (replaces ``since``).
+    :return: (changed notes, tombstones, new watermark, next cursor or None).
+    :raises ValueError: if the cursor is malformed.
+    """
+    notes_after: dict | None = None
+    deleted_after: dict | None = None
+    filters_notes = [("updated_at", ">", since)] if since else []
+    filters_deleted = [("deleted_at", ">", since)] if since else []
+    if cursor is not None:
+        since, kind, doc_id = decode_changes_cursor(cursor)
+        if kind == CHANGES_KIND_NOTE:
+            notes_after = {"updated_at": since, "__name__": doc_id}
+            filters_notes, filters_deleted = [], [("deleted_at", ">=", since)]
+        else:
+            deleted_after = {"deleted_at": since, "__name__": doc_id}
+            filters_notes, filters_deleted = [("updated_at", ">", since)], []
+    changed = await _query_notes(
+        user_id, CHANGES_ORDER, limit=limit + 1, start_after=notes_after, filters=filters_notes
+    )
+    deleted = await list_documents_where(
+        TOMBSTONE_COLLECTION,
+        USER_ID_FIELD,
+        user_id,
+        order_by=TOMBSTONES_ORDER,
+        limit=limit + 1,
+        start_after=deleted_after,
+        filters=filters_deleted,
+    )
+    events = sorted(
+        [(n["updated_at"], CHANGES_KIND_NOTE, n["id"], n) for n in changed]
+        + [(t["deleted_at"], CHANGES_KIND_DELETE, t["id"], t) for t in deleted],
+        key=lambda e: e[:3],
+    )
+    pending = events[limit:]
+    events = events[:limit]
+    notes = await _inflate_all([doc for _, kind, _, doc in events if kind == CHANGES_KIND_NOTE])
+    tombstones = [doc for _, kind, _, doc in events if kind == CHANGES_KIND_DELETE]
+
+    if pending:
+        last = events[-1]
+        next_cursor = encode_changes_cursor(*last[:3])
+        # Never past an event not yet returned: a client resuming from ``since``
+        # instead of the cursor gets the rest of a timestamp tie again.
+        watermark = last[0] if pending[0][0] > last[0] else last[0] - timedelta(microseconds=1)
+    else:
+        next_cursor = None
+        settled = _timestamp() - timedelta(seconds=settings.note_sync_safety_lag_seconds)
+        watermark = min(events[-1][0], settled) if events else settled
+        if since is not None:
+            watermark = max(watermark, since)
+    return notes, tombstones, watermark, next_cursor
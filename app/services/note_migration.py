@@ -0,0 +1,163 @@
+"""Move notes from the global ``notes`` collection to per-user subcollections (users/{uid}/notes).
+
+Run once every instance serves NOTES_LAYOUT=dual, with the same settings as the service:
+
+    python -m app.services.note_migration --batch-size 200 --pause 0.1
+    python -m app.services.note_migration --dry-run
+
+Each batch is one transaction (``move_to_subcollections``): a note is copied and
+deleted atomically, so it is always in exactly one place, and dual reads and
+writes stay correct while the service keeps running. Progress is checkpointed in
+``migrations/notes_layout`` after every batch: an interrupted run resumes after
+the last batch; a run after a completed one sweeps the collection again (cheap,
+moved notes are gone) to pick up notes written by instances not yet in dual mode.
+When a sweep moves nothing, switch to NOTES_LAYOUT=subcollection.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Any
+
+from app.config import settings
+from app.core.firebase import close_firebase, init_firebase
+from app.services.firestore_async_service import (
+    MAX_WRITES_PER_COMMIT,
+    get_document,
+    list_documents_where,
+    set_document,
+)
+from app.services.note_firestore_service import (
+    COLLECTION,
+    LAYOUT_DUAL,
+    USER_ID_FIELD,
+    move_to_subcollections,
+)
+from app.services.storage_backend import local_storage
+
+logger = logging.getLogger("app.services.note_migration")
+
+CHECKPOINT_COLLECTION = "migrations"
+CHECKPOINT_ID = "notes_layout"
+MAX_BATCH_SIZE = MAX_WRITES_PER_COMMIT // 2  # a move is two writes
+
+
+def _movable(doc: dict) -> bool:
+    owner = doc.get(USER_ID_FIELD)
+    return isinstance(owner, str) and bool(owner) and "/" not in owner
+
+
+async def migrate_notes(
+    batch_size: int = settings.notes_migration_batch_size,
+    pause_seconds: float = 0.0,
+    restart: bool = False,
+    dry_run: bool = False,
+    max_batches: int | None = None,
+) -> dict[str, Any]:
+    """
+    Move the global collection's notes in batches of ``batch_size`` (by document id).
+    :param pause_seconds: Sleep between batches (limits the load on a live service).
+    :param restart: Ignore an unfinished checkpoint and start from the first id.
+    :param dry_run: Only count what would be moved (no writes, no checkpoint).
+    :param max_batches: Stop after this many batches (resume later).
+    :return: Progress: last_id, batches, moved, skipped, completed.
+    """
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+    checkpoint = None if restart else await get_document(CHECKPOINT_COLLECTION, CHECKPOINT_ID)
+    state: dict[str, Any] = {"last_id": None, "batches": 0, "moved": 0, "skipped": 0}
+    if checkpoint is not None and not checkpoint.get("completed"):
+        state.update({key: checkpoint.get(key, state[key]) for key in state})
+        logger.info("Resuming after id=%s moved=%d", state["last_id"], state["moved"])
+    state["completed"] = False
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        page = await list_documents_where(
+            COLLECTION,
+            None,
+            None,
+            order_by="__name__",
+            limit=batch_size,
+            start_after={"__name__": state["last_id"]} if state["last_id"] else None,
+            select=[USER_ID_FIELD],
+        )
+        if dry_run:
+            moved = [doc["id"] for doc in page if _movable(doc)]
+            skipped = [doc["id"] for doc in page if not _movable(doc)]
+        else:
+            moved, skipped = await move_to_subcollections([doc["id"] for doc in page])
+        batches += 1
+        state["batches"] += 1
+        state["moved"] += len(moved)
+        state["skipped"] += len(skipped)
+        if page:
+            state["last_id"] = page[-1]["id"]
+        state["completed"] = len(page) < batch_size
+        if skipped:
+            logger.warning("Skipped notes without a valid %s: %s", USER_ID_FIELD, skipped)
+        logger.info(
+            "Batch %d: moved=%d skipped=%d last_id=%s",
+            state["batches"],
+            len(moved),
+            len(skipped),
+            state["last_id"],
+        )
+        if not dry_run:
+            await set_document(
+                CHECKPOINT_COLLECTION,
+                CHECKPOINT_ID,
+                {**state, "updated_at": datetime.now(timezone.utc)},
+            )
+        if state["completed"]:
+            break
+        if pause_seconds > 0:
+            await asyncio.sleep(pause_seconds)
+    return state
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    if local_storage is None:
+        init_firebase()
+    try:
+        return await migrate_notes(
+            args.batch_size, args.pause, args.restart, args.dry_run, args.max_batches
+        )
+    finally:
+        if local_storage is not None:
+            await local_storage.close()
+        close_firebase()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Move notes to per-user subcollections (run with NOTES_LAYOUT=dual)."
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.notes_migration_batch_size)
+    parser.add_argument("--pause", type=float, default=0.1, help="seconds between batches")
+    parser.add_argument("--max-batches", type=int, default=None, help="stop after N batches")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="count only, write nothing")
+    parser.add_argument(
+        "--force", action="store_true", help="run even if NOTES_LAYOUT is not dual"
+    )
+    args = parser.parse_args(argv)
+    if settings.notes_layout != LAYOUT_DUAL and not (args.force or args.dry_run):
+        parser.error(
+            "NOTES_LAYOUT must be dual (the service must read both layouts while notes move)"
+        )
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    state = asyncio.run(_run(args))
+    print(json.dumps(state))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
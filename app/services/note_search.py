@@ -0,0 +1,250 @@
+"""Per-user inverted index over note titles and content, maintained incrementally.
+
+``note_firestore_service`` builds a user's index on the first search (from the
+note cache or one Firestore read) and then applies every create/update/delete
+to it. Like note_cache, each index is tagged with the user's notes version
+marker, so writes from other instances cause a rebuild instead of stale results.
+"""
+
+import base64
+import json
+import math
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime
+
+from app.config import settings
+
+# Title matches count this many times a content match.
+TITLE_WEIGHT = 3
+# BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+SUMMARY_KEYS = ("id", "title", "is_pinned", "excerpt", "created_at", "updated_at")
+
+_WORD = re.compile(r"\w+")
+# Letters NFKD does not decompose to their ASCII base (Turkish dotless i).
+_FOLD = str.maketrans({"ı": "i"})
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with accents removed (e.g. "Çalışma" -> "calisma")."""
+    text = text.casefold()
+    if not text.isascii():
+        text = "".join(
+            c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)
+        ).translate(_FOLD)
+    return _WORD.findall(text)
+
+
+def encode_search_cursor(offset: int) -> str:
+    """Opaque cursor for the next page of search results."""
+    raw = json.dumps({"o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> int:
+    """Offset from a search cursor. Raises ValueError if malformed."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(raw["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def _created_ts(summary: dict) -> float:
+    created_at = summary.get("created_at")
+    return created_at.timestamp() if isinstance(created_at, datetime) else 0.0
+
+
+class UserSearchIndex:
+    """Inverted index (term -> note id -> weighted term frequency) for one user's notes."""
+
+    def __init__(self, version: str) -> None:
+        self.version = version
+        self.built_at = time.monotonic()
+        self._postings: dict[str, dict[str, int]] = {}
+        self._doc_terms: dict[str, dict[str, int]] = {}
+        self._doc_len: dict[str, int] = {}
+        self._total_len = 0
+        self._summaries: dict[str, dict] = {}
+        self._vocab: list[str] | None = None  # sorted terms for prefix queries (lazy)
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def upsert(self, doc: dict) -> None:
+        """Index (or re-index) a note document."""
+        note_id = doc["id"]
+        self.remove(note_id)
+        terms: dict[str, int] = {}
+        for term in tokenize(doc.get("title", "")):
+            terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+        content = doc.get("content", "")
+        for term in tokenize(content):
+            terms[term] = terms.get(term, 0) + 1
+        for term, tf in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                self._vocab = None
+            posting[note_id] = tf
+        length = sum(terms.values())
+        self._doc_terms[note_id] = terms
+        self._doc_len[note_id] = length
+        self._total_len += length
+        summary = {key: doc.get(key) for key in SUMMARY_KEYS}
+        summary["is_pinned"] = bool(summary["is_pinned"])
+        self._summaries[note_id] = summary
+
+    def remove(self, note_id: str) -> None:
+        """Drop a note from the index (no-op if absent)."""
+        terms = self._doc_terms.pop(note_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings[term]
+            del posting[note_id]
+            if not posting:
+                del self._postings[term]
+                self._vocab = None
+        self._total_len -= self._doc_len.pop(note_id)
+        del self._summaries[note_id]
+
+    def _expand_prefix(self, prefix: str) -> list[str]:
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        start = bisect_left(self._vocab, prefix)
+        matches = []
+        for term in self._vocab[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query: str) -> list[dict]:
+        """
+        Notes matching every query term (the last term also as a prefix, for
+        search-as-you-type), ranked by BM25 score, then pinned first, then newest.
+        :return: Note summaries (id, title, is_pinned, excerpt, timestamps).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_terms:
+            return []
+        groups: list[list[str]] = [[term] for term in terms]
+        if not query[-1:].isspace():
+            groups[-1] = self._expand_prefix(terms[-1])
+        # Each group is one query term (or its prefix expansions); a note must match all groups.
+        group_docs: list[set[str]] = []
+        for group in groups:
+            docs: set[str] = set()
+            for term in group:
+                docs.update(self._postings.get(term, ()))
+            if not docs:
+                return []
+            group_docs.append(docs)
+        group_docs.sort(key=len)
+        candidates = set.intersection(*group_docs)
+
+        total = len(self._doc_terms)
+        avg_len = self._total_len / total if total else 1.0
+        scores = dict.fromkeys(candidates, 0.0)
+        for group in groups:
+            for term in group:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+                for note_id in candidates.intersection(posting):
+                    tf = posting[note_id]
+                    norm = K1 * (1 - B + B * self._doc_len[note_id] / avg_len)
+                    scores[note_id] += idf * tf * (K1 + 1) / (tf + norm)
+        ranked = sorted(
+            candidates,
+            key=lambda i: (
+                -scores[i],
+                not self._summaries[i]["is_pinned"],
+                -_created_ts(self._summaries[i]),
+                i,
+            ),
+        )
+        return [self._summaries[note_id] for note_id in ranked]
+
+
+class NoteSearchIndex:
+    """LRU of per-user indexes (at most NOTE_SEARCH_MAX_USERS, rebuilt after NOTE_SEARCH_TTL_SECONDS)."""
+
+    def __init__(self, max_users: int, ttl_seconds: float) -> None:
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._indexes: OrderedDict[str, UserSearchIndex] = OrderedDict()
+        self.builds = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, user_id: str, version: str) -> UserSearchIndex | None:
+        """The user's index if it is at ``version`` and not older than the TTL."""
+        index = self._indexes.get(user_id)
+        if index is None:
+            return None
+        if index.version != version or time.monotonic() - index.built_at > self.ttl_seconds:
+            del self._indexes[user_id]
+            return None
+        self._indexes.move_to_end(user_id)
+        self.hits += 1
+        return index
+
+    def put(self, user_id: str, index: UserSearchIndex) -> None:
+        self.builds += 1
+        if self.max_users <= 0:
+            return
+        self._indexes[user_id] = index
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+            self.evictions += 1
+
+    def apply(
+        self,
+        user_id: str,
+        prev: str,
+        version: str,
+        upserted: Sequence[dict] = (),
+        removed: Sequence[str] = (),
+    ) -> None:
+        """
+        Apply a committed write to the user's index, if built: only when the index is
+        at ``prev`` (the version the write replaced); otherwise it missed a write from
+        elsewhere and is evicted, to be rebuilt by the next search.
+        """
+        index = self._indexes.get(user_id)
+        if index is None:
+            return
+        if index.version != prev:
+            del self._indexes[user_id]
+            return
+        for note_id in removed:
+            index.remove(note_id)
+        for doc in upserted:
+            index.upsert(doc)
+        index.version = version
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "users": len(self._indexes),
+            "max_users": self.max_users,
+            "builds": self.builds,
+            "hits": self.hits,
+            "evictions": self.evictions,
+        }
+
+
+search_index = NoteSearchIndex(settings.note_search_max_users, settings.note_search_ttl_seconds)
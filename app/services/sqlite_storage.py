@@ -0,0 +1,154 @@
+"""SQLite storage backend (STORAGE_BACKEND=sqlite) for single-node deployments."""
+
+import base64
+import json
+import re
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TypeVar
+
+from app.core.executor import run_blocking
+from app.services.storage_backend import DocumentKey, DocumentStore, field_value
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID
+"""
+
+# Fields that can be indexed with json_extract (used verbatim in SQL).
+_INDEXABLE_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"$b": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "$dt" in obj:
+            return datetime.fromisoformat(obj["$dt"])
+        if "$b" in obj:
+            return base64.b64decode(obj["$b"])
+    return obj
+
+
+def _dumps(data: dict[str, Any]) -> str:
+    return json.dumps(data, default=_encode, ensure_ascii=False, separators=(",", ":"))
+
+
+def _loads(text: str) -> dict[str, Any]:
+    return json.loads(text, object_hook=_decode)
+
+
+class SqliteStorage(DocumentStore):
+    """
+    Documents as JSON rows in one ``documents`` table (datetimes and bytes tagged).
+
+    ``field == value`` queries on string/number/bool values use an expression index
+    on ``json_extract(data, '$.field')``, created on first use; remaining filters,
+    ordering and paging run in Python (see ``evaluate_query``). Calls run on the
+    Firebase executor (``run_blocking``) so the event loop never waits on disk;
+    each operation is one SQLite transaction (``BEGIN IMMEDIATE`` for writes).
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._indexed_fields: set[str] = set()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _in_transaction(self, fn: Callable[[], T], write: bool) -> T:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                result = fn()
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    async def _run(self, fn: Callable[[], T], write: bool = False) -> T:
+        return await run_blocking(self._in_transaction, fn, write)
+
+    def _load(self, collection: str, document_id: str) -> dict[str, Any] | None:
+        row = self._connection().execute(
+            "SELECT data FROM documents WHERE collection = ? AND id = ?", (collection, document_id)
+        ).fetchone()
+        return _loads(row[0]) if row is not None else None
+
+    def _commit(self, pending: dict[DocumentKey, dict[str, Any] | None]) -> None:
+        conn = self._connection()
+        deletes = [key for key, data in pending.items() if data is None]
+        upserts = [(c, i, _dumps(data)) for (c, i), data in pending.items() if data is not None]
+        if deletes:
+            conn.executemany("DELETE FROM documents WHERE collection = ? AND id = ?", deletes)
+        if upserts:
+            conn.executemany(
+                "INSERT INTO documents (collection, id, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (collection, id) DO UPDATE SET data = excluded.data",
+                upserts,
+            )
+
+    def _ensure_index(self, field: str) -> str:
+        """SQL expression for field, with an index on (collection, expression)."""
+        expr = f"json_extract(data, '$.{field}')"
+        if field not in self._indexed_fields:
+            self._connection().execute(
+                f"CREATE INDEX IF NOT EXISTS ix_documents_{field} ON documents (collection, {expr})"
+            )
+            self._indexed_fields.add(field)
+        return expr
+
+    def _scan(
+        self, collection: str, field: str | None = None, value: Any = None
+    ) -> Iterable[tuple[str, dict[str, Any]]]:
+        conn = self._connection()
+        if (
+            field is not None
+            and _INDEXABLE_FIELD.match(field)
+            and isinstance(value, (str, int, float, bool))
+        ):
+            expr = self._ensure_index(field)
+            rows = conn.execute(
+                f"SELECT id, data FROM documents WHERE collection = ? AND {expr} = ?",
+                (collection, int(value) if isinstance(value, bool) else value),
+            )
+            return [(doc_id, _loads(data)) for doc_id, data in rows]
+        rows = conn.execute("SELECT id, data FROM documents WHERE collection = ?", (collection,))
+        docs = [(doc_id, _loads(data)) for doc_id, data in rows]
+        if field is None:
+            return docs
+        return [(doc_id, data) for doc_id, data in docs if field_value(doc_id, data, field) == value]
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
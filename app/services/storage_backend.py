@@ -0,0 +1,575 @@
+"""Storage backend protocol and shared logic for local (non-Firestore) document stores.
+
+``firestore_async_service`` talks to Firestore by default; with STORAGE_BACKEND=memory
+or sqlite every call is delegated to ``local_storage`` instead, so the API runs
+without a Firebase project (CI, load tests, local development, single-node mode).
+Payload and order_by normalization is shared with the Firestore path.
+"""
+
+import logging
+import operator
+import secrets
+import string
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable, Sequence
+from datetime import datetime
+from typing import Any, Protocol, TypeVar
+
+from app.config import settings
+from app.core.startup import lazy_import
+
+logger = logging.getLogger("app.services.storage")
+
+api_exceptions = lazy_import("google.api_core.exceptions")
+
+T = TypeVar("T")
+
+OrderBy = str | Sequence[str | tuple[str, bool]] | None
+Filter = tuple[str, str, Any]
+DocumentKey = tuple[str, str]
+# Receives [(kind, document with id)], kind is "added", "modified" or "removed".
+ChangeCallback = Callable[[list[tuple[str, dict[str, Any]]]], None]
+
+_AUTO_ID_CHARS = string.ascii_letters + string.digits
+_AUTO_ID_LENGTH = 20
+
+
+def _ensure_dict(data: dict[str, Any]) -> dict[str, Any]:
+    """Convert Pydantic model or dict to plain dict for Firestore (timestamps, etc.)."""
+    out: dict[str, Any] = {}
+    for k, v in data.items():
+        if v is None:
+            continue
+        if isinstance(v, datetime):
+            out[k] = v
+        elif hasattr(v, "model_dump"):
+            out[k] = v.model_dump(exclude_none=True)
+        elif isinstance(v, dict):
+            out[k] = _ensure_dict(v)
+        else:
+            out[k] = v
+    return out
+
+
+def _normalize_order(
+    order_by: str | Sequence[str | tuple[str, bool]] | None,
+    descending: bool = False,
+) -> list[tuple[str, bool]]:
+    """
+    Normalize order_by to [(field, descending), ...].
+
+    Accepts a single field name, or a sequence of field names / (field, descending)
+    tuples; bare names use the ``descending`` default.
+    """
+    if not order_by:
+        return []
+    if isinstance(order_by, str):
+        return [(order_by, descending)]
+    return [(o, descending) if isinstance(o, str) else (o[0], bool(o[1])) for o in order_by]
+
+
+class StorageBackend(Protocol):
+    """
+    Document store with the operations of ``firestore_async_service`` (same names,
+    arguments and results). WriteOp is ``firestore_async_service.WriteOp``.
+    """
+
+    def new_document_id(self, collection: str) -> str:
+        """New auto-ID (20 alphanumeric characters, like Firestore)."""
+        ...
+
+    async def set_document(
+        self, collection: str, document_id: str, data: dict[str, Any], merge: bool = False
+    ) -> str:
+        """Create or overwrite (or merge into) a document; return its ID."""
+        ...
+
+    async def add_document(self, collection: str, data: dict[str, Any]) -> str:
+        """Add a document with an auto-ID; return the ID."""
+        ...
+
+    async def update_document(self, collection: str, document_id: str, data: dict[str, Any]) -> None:
+        """Partial update; raises NotFound if the document does not exist."""
+        ...
+
+    async def delete_document(self, collection: str, document_id: str) -> None:
+        """Delete a document (no-op if missing)."""
+        ...
+
+    async def get_document(self, collection: str, document_id: str) -> dict[str, Any] | None:
+        """Document data with id, or None."""
+        ...
+
+    async def get_documents(
+        self, collection: str, document_ids: Sequence[str]
+    ) -> dict[str, dict[str, Any] | None]:
+        """Mapping id -> document (with id) or None."""
+        ...
+
+    async def list_documents(self, collection: str) -> list[dict[str, Any]]:
+        """All documents in a collection."""
+        ...
+
+    async def list_documents_where(
+        self,
+        collection: str,
+        field: str | None,
+        value: Any,
+        order_by: OrderBy = None,
+        descending: bool = False,
+        limit: int | None = None,
+        start_after: dict[str, Any] | None = None,
+        select: Sequence[str] | None = None,
+        filters: Sequence[Filter] = (),
+    ) -> list[dict[str, Any]]:
+        """
+        Documents where field == value (every document if field is None), filtered,
+        ordered and paged like the Firestore query.
+        """
+        ...
+
+    def stream_documents_where(
+        self,
+        collection: str,
+        field: str | None,
+        value: Any,
+        order_by: OrderBy = None,
+        descending: bool = False,
+        limit: int | None = None,
+        start_after: dict[str, Any] | None = None,
+        select: Sequence[str] | None = None,
+        filters: Sequence[Filter] = (),
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Async iterator version of list_documents_where."""
+        ...
+
+    async def commit_writes(self, ops: Sequence[Any]) -> None:
+        """Apply WriteOps atomically."""
+        ...
+
+    async def run_in_transaction(
+        self,
+        collection: str,
+        read_ids: Sequence[str],
+        plan: Callable[[dict[Any, dict[str, Any] | None]], tuple[Sequence[Any], T]],
+        extra_reads: Sequence[tuple[str, str]] = (),
+    ) -> T:
+        """
+        Read documents, plan writes from them and commit atomically. ``current``
+        is keyed by id for ``read_ids`` and by (collection, id) for ``extra_reads``.
+        """
+        ...
+
+    def watch_documents_where(
+        self, collection: str, field: str, value: Any, callback: ChangeCallback
+    ) -> Callable[[], None]:
+        """
+        Call ``callback`` on the event loop with the changes of every later commit
+        that touches documents where field == value. Returns the unsubscribe function.
+        """
+        ...
+
+    async def close(self) -> None:
+        """Release resources (connections, files)."""
+        ...
+
+
+def copy_value(value: Any) -> Any:
+    """Copy nested dicts/lists so stored documents are never shared with callers."""
+    if isinstance(value, dict):
+        return {k: copy_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_value(v) for v in value]
+    return value
+
+
+def _merge(base: dict[str, Any], changes: dict[str, Any]) -> dict[str, Any]:
+    """Deep-merge changes into a copy of base (Firestore ``set(..., merge=True)``)."""
+    merged = dict(base)
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+MISSING = object()
+
+
+def field_value(doc_id: str, data: dict[str, Any], name: str) -> Any:
+    """Value of a (dotted) field path; ``__name__`` is the document id. MISSING if absent."""
+    if name == "__name__":
+        return doc_id
+    value: Any = data
+    for part in name.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def _range(compare: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    """Range filter: as in Firestore, null and values of another type never match."""
+
+    def check(value: Any, operand: Any) -> bool:
+        if value is None or operand is None:
+            return False
+        try:
+            return compare(value, operand)
+        except TypeError:
+            return False
+
+    return check
+
+
+_FILTER_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": _range(operator.lt),
+    "<=": _range(operator.le),
+    ">": _range(operator.gt),
+    ">=": _range(operator.ge),
+    "in": lambda value, operand: value in operand,
+    "not-in": lambda value, operand: value not in operand,
+    "array_contains": lambda value, operand: isinstance(value, list) and operand in value,
+    "array-contains": lambda value, operand: isinstance(value, list) and operand in value,
+    "array-contains-any": lambda value, operand: isinstance(value, list)
+    and any(o in value for o in operand),
+}
+
+
+def _order_value(value: Any) -> tuple[bool, Any]:
+    """Sort key for a field value: null sorts before every other value, as in Firestore."""
+    return (value is not None, value)
+
+
+def _is_after(
+    doc_id: str, data: dict[str, Any], cursor: dict[str, Any], orders: list[tuple[str, bool]]
+) -> bool:
+    """True if the document sorts strictly after the cursor values."""
+    for name, desc in orders:
+        if name not in cursor:
+            continue
+        value = _order_value(field_value(doc_id, data, name))
+        bound = _order_value(cursor[name])
+        if value == bound:
+            continue
+        return value < bound if desc else value > bound
+    return False
+
+
+def evaluate_query(
+    docs: Iterable[tuple[str, dict[str, Any]]],
+    orders: list[tuple[str, bool]],
+    limit: int | None = None,
+    start_after: dict[str, Any] | None = None,
+    select: Sequence[str] | None = None,
+    filters: Sequence[Filter] = (),
+) -> list[dict[str, Any]]:
+    """
+    Run a Firestore-style query over (id, data) pairs in Python.
+
+    Like Firestore, documents missing a filtered or ordered field are excluded.
+    :return: Matching documents (copies, each with id), projected to ``select`` if given.
+    """
+    checks = [(name, _FILTER_OPS[op], operand) for name, op, operand in filters]
+    required = [name for name, _ in orders if name != "__name__"]
+    matched: list[tuple[str, dict[str, Any]]] = []
+    for doc_id, data in docs:
+        if any(field_value(doc_id, data, name) is MISSING for name in required):
+            continue
+        ok = True
+        for name, check, operand in checks:
+            value = field_value(doc_id, data, name)
+            if value is MISSING or not check(value, operand):
+                ok = False
+                break
+        if ok:
+            matched.append((doc_id, data))
+    # Stable multi-key sort: least significant key first.
+    for name, desc in reversed(orders):
+        matched.sort(
+            key=lambda item, name=name: _order_value(field_value(item[0], item[1], name)),
+            reverse=desc,
+        )
+    if start_after:
+        matched = [item for item in matched if _is_after(item[0], item[1], start_after, orders)]
+    if limit is not None:
+        matched = matched[:limit]
+    if select is not None:
+        fields = list(select)
+        return [
+            {"id": doc_id, **{k: copy_value(data[k]) for k in fields if k in data}}
+            for doc_id, data in matched
+        ]
+    return [{"id": doc_id, **copy_value(data)} for doc_id, data in matched]
+
+
+def _watched(by_value: dict[Hashable, list[ChangeCallback]], value: Any) -> bool:
+    return value is not MISSING and isinstance(value, Hashable) and value in by_value
+
+
+class BufferedTransaction:
+    """Reads through to the store; writes are buffered and committed together at the end."""
+
+    def __init__(self, load: Callable[[str, str], dict[str, Any] | None]) -> None:
+        self._load = load
+        self.pending: dict[DocumentKey, dict[str, Any] | None] = {}
+
+    def get(self, collection: str, document_id: str) -> dict[str, Any] | None:
+        key = (collection, document_id)
+        if key in self.pending:
+            data = self.pending[key]
+            return dict(data) if data is not None else None
+        return self._load(collection, document_id)
+
+    def apply(self, op: Any) -> None:
+        """Buffer a WriteOp."""
+        self.write(op.kind, op.collection, op.document_id, op.data, op.merge)
+
+    def write(
+        self,
+        kind: str,
+        collection: str,
+        document_id: str,
+        data: dict[str, Any] | None = None,
+        merge: bool = False,
+    ) -> None:
+        """Buffer a write: kind is "set", "update" or "delete"."""
+        key = (collection, document_id)
+        if kind == "delete":
+            self.pending[key] = None
+            return
+        payload = _ensure_dict(dict(data or {}))
+        current = self.get(collection, document_id)
+        if kind == "set":
+            self.pending[key] = _merge(current or {}, payload) if merge else payload
+        elif kind == "update":
+            if current is None:
+                raise api_exceptions.NotFound(f"No document to update: {collection}/{document_id}")
+            self.pending[key] = {**current, **payload}
+        else:
+            raise ValueError(f"Unknown write kind: {kind}")
+
+
+class DocumentStore:
+    """
+    Base class for local backends: implements StorageBackend on top of four primitives.
+
+    Subclasses provide ``_load`` (one document or None), ``_commit`` (apply buffered
+    writes, None = delete), ``_scan`` (candidate (id, data) pairs, narrowed by an
+    equality index when possible) and ``_run`` (execute a function atomically).
+    Watchers are notified after each commit with the changes to matching documents.
+    """
+
+    def __init__(self) -> None:
+        # (collection, field) -> value -> callbacks
+        self._watchers: dict[tuple[str, str], dict[Hashable, list[ChangeCallback]]] = {}
+
+    def _load(self, collection: str, document_id: str) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    def _commit(self, pending: dict[DocumentKey, dict[str, Any] | None]) -> None:
+        raise NotImplementedError
+
+    def _scan(
+        self, collection: str, field: str | None = None, value: Any = None
+    ) -> Iterable[tuple[str, dict[str, Any]]]:
+        raise NotImplementedError
+
+    async def _run(self, fn: Callable[[], T], write: bool = False) -> T:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    async def _atomic(self, fn: Callable[[BufferedTransaction], T]) -> T:
+        def transaction() -> tuple[T, BufferedTransaction, dict[DocumentKey, dict[str, Any] | None]]:
+            tx = BufferedTransaction(self._load)
+            result = fn(tx)
+            before: dict[DocumentKey, dict[str, Any] | None] = {}
+            if tx.pending:
+                watched = {collection for collection, _ in self._watchers}
+                before = {key: self._load(*key) for key in tx.pending if key[0] in watched}
+                self._commit(tx.pending)
+            return result, tx, before
+
+        result, tx, before = await self._run(transaction, write=True)
+        if before:
+            self._notify(before, tx.pending)
+        return result
+
+    def watch_documents_where(
+        self, collection: str, field: str, value: Any, callback: ChangeCallback
+    ) -> Callable[[], None]:
+        callbacks = self._watchers.setdefault((collection, field), {}).setdefault(value, [])
+        callbacks.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in callbacks:
+                callbacks.remove(callback)
+            by_value = self._watchers.get((collection, field), {})
+            if not by_value.get(value, True):
+                del by_value[value]
+                if not by_value:
+                    del self._watchers[(collection, field)]
+
+        return unsubscribe
+
+    def _notify(
+        self,
+        before: dict[DocumentKey, dict[str, Any] | None],
+        after: dict[DocumentKey, dict[str, Any] | None],
+    ) -> None:
+        """Report committed changes (before -> after) to the watchers of the affected values."""
+        for (collection, field), by_value in list(self._watchers.items()):
+            grouped: dict[Hashable, list[tuple[str, dict[str, Any]]]] = {}
+            for key, old in before.items():
+                if key[0] != collection:
+                    continue
+                doc_id, new = key[1], after[key]
+                old_value = field_value(doc_id, old, field) if old is not None else MISSING
+                new_value = field_value(doc_id, new, field) if new is not None else MISSING
+                if old_value != new_value and _watched(by_value, old_value):
+                    grouped.setdefault(old_value, []).append(("removed", {**old, "id": doc_id}))
+                if _watched(by_value, new_value):
+                    kind = "modified" if old_value == new_value else "added"
+                    grouped.setdefault(new_value, []).append((kind, {**copy_value(new), "id": doc_id}))
+            for value, changes in grouped.items():
+                for callback in list(by_value.get(value, ())):
+                    try:
+                        callback(changes)
+                    except Exception:  # noqa: BLE001
+                        logger.exception("Storage watch callback failed collection=%s", collection)
+
+    def new_document_id(self, collection: str) -> str:
+        return "".join(secrets.choice(_AUTO_ID_CHARS) for _ in range(_AUTO_ID_LENGTH))
+
+    async def set_document(
+        self, collection: str, document_id: str, data: dict[str, Any], merge: bool = False
+    ) -> str:
+        await self._atomic(lambda tx: tx.write("set", collection, document_id, data, merge))
+        logger.debug("set_document collection=%s id=%s", collection, document_id)
+        return document_id
+
+    async def add_document(self, collection: str, data: dict[str, Any]) -> str:
+        return await self.set_document(collection, self.new_document_id(collection), data)
+
+    async def update_document(self, collection: str, document_id: str, data: dict[str, Any]) -> None:
+        await self._atomic(lambda tx: tx.write("update", collection, document_id, data))
+        logger.debug("update_document collection=%s id=%s", collection, document_id)
+
+    async def delete_document(self, collection: str, document_id: str) -> None:
+        await self._atomic(lambda tx: tx.write("delete", collection, document_id))
+        logger.debug("delete_document collection=%s id=%s", collection, document_id)
+
+    async def get_document(self, collection: str, document_id: str) -> dict[str, Any] | None:
+        data = await self._run(lambda: self._load(collection, document_id))
+        return {**data, "id": document_id} if data is not None else None
+
+    async def get_documents(
+        self, collection: str, document_ids: Sequence[str]
+    ) -> dict[str, dict[str, Any] | None]:
+        def read() -> dict[str, dict[str, Any] | None]:
+            found: dict[str, dict[str, Any] | None] = {}
+            for doc_id in dict.fromkeys(document_ids):
+                data = self._load(collection, doc_id)
+                found[doc_id] = {**data, "id": doc_id} if data is not None else None
+            return found
+
+        return await self._run(read)
+
+    async def list_documents(self, collection: str) -> list[dict[str, Any]]:
+        return await self._run(lambda: evaluate_query(self._scan(collection), []))
+
+    async def list_documents_where(
+        self,
+        collection: str,
+        field: str | None,
+        value: Any,
+        order_by: OrderBy = None,
+        descending: bool = False,
+        limit: int | None = None,
+        start_after: dict[str, Any] | None = None,
+        select: Sequence[str] | None = None,
+        filters: Sequence[Filter] = (),
+    ) -> list[dict[str, Any]]:
+        orders = _normalize_order(order_by, descending)
+        docs = await self._run(
+            lambda: evaluate_query(
+                self._scan(collection, field, value), orders, limit, start_after, select, filters
+            )
+        )
+        logger.debug(
+            "list_documents_where collection=%s field=%s count=%d", collection, field, len(docs)
+        )
+        return docs
+
+    async def stream_documents_where(
+        self,
+        collection: str,
+        field: str | None,
+        value: Any,
+        order_by: OrderBy = None,
+        descending: bool = False,
+        limit: int | None = None,
+        start_after: dict[str, Any] | None = None,
+        select: Sequence[str] | None = None,
+        filters: Sequence[Filter] = (),
+    ) -> AsyncIterator[dict[str, Any]]:
+        docs = await self.list_documents_where(
+            collection, field, value, order_by, descending, limit, start_after, select, filters
+        )
+        for doc in docs:
+            yield doc
+
+    async def commit_writes(self, ops: Sequence[Any]) -> None:
+        def apply(tx: BufferedTransaction) -> None:
+            for op in ops:
+                tx.apply(op)
+
+        await self._atomic(apply)
+        logger.debug("commit_writes count=%d", len(ops))
+
+    async def run_in_transaction(
+        self,
+        collection: str,
+        read_ids: Sequence[str],
+        plan: Callable[[dict[Any, dict[str, Any] | None]], tuple[Sequence[Any], T]],
+        extra_reads: Sequence[tuple[str, str]] = (),
+    ) -> T:
+        def apply(tx: BufferedTransaction) -> T:
+            current: dict[Any, dict[str, Any] | None] = {}
+            for doc_id in dict.fromkeys(read_ids):
+                data = tx.get(collection, doc_id)
+                current[doc_id] = {**data, "id": doc_id} if data is not None else None
+            for key in dict.fromkeys(extra_reads):
+                data = tx.get(*key)
+                current[key] = {**data, "id": key[1]} if data is not None else None
+            writes, result = plan(current)
+            for op in writes:
+                tx.apply(op)
+            return result
+
+        return await self._atomic(apply)
+
+
+def create_storage_backend() -> StorageBackend | None:
+    """Build the backend selected by STORAGE_BACKEND (None = Firestore)."""
+    backend = settings.storage_backend
+    if backend == "firestore":
+        return None
+    if backend == "memory":
+        from app.services.memory_storage import MemoryStorage
+
+        logger.info("Using in-memory storage backend (data is lost on restart)")
+        return MemoryStorage()
+    if backend == "sqlite":
+        from app.services.sqlite_storage import SqliteStorage
+
+        logger.info("Using SQLite storage backend path=%s", settings.storage_sqlite_path)
+        return SqliteStorage(settings.storage_sqlite_path)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+local_storage = create_storage_backend()
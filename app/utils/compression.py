@@ -0,0 +1,34 @@
+"""Byte compression codecs for data stored at rest (zlib; zstd when ``zstandard`` is installed)."""
+
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+
+
+def available_codecs() -> tuple[str, ...]:
+    """Codec names usable on this install."""
+    return (ZLIB, ZSTD) if zstandard is not None else (ZLIB,)
+
+
+def compress(data: bytes, codec: str, level: int = 1) -> bytes:
+    """Compress data with codec ("zlib" or "zstd") at level. Raises ValueError if unavailable."""
+    if codec == ZLIB:
+        return zlib.compress(data, level)
+    if codec == ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Inverse of compress. Raises ValueError if the codec is unknown or unavailable."""
+    if codec == ZLIB:
+        return zlib.decompress(data)
+    if codec == ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unsupported compression codec: {codec}")
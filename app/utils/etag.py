@@ -0,0 +1,24 @@
+"""Strong ETag helpers for conditional GET (If-None-Match / 304)."""
+
+import hashlib
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag (quoted) from the given parts, e.g. a version marker and query params."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison, ``*`` allowed)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,83 @@
+"""Micro-benchmark: serializing a list of notes (model validation path vs. dict + fast JSON path).
+
+Run from the repo root: ``python -m benchmarks.bench_serialization``
+"""
+
+import json
+import time
+from datetime import timezone
+
+from fastapi.encoders import jsonable_encoder
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from pydantic import TypeAdapter
+
+from app.api.v1.notes import _note_to_response
+from app.core.responses import dumps
+from app.models import NoteResponse
+
+NOTE_COUNT = 1_000
+ROUNDS = 50
+
+
+def _make_notes(count: int) -> list[dict]:
+    """Firestore-shaped docs (timestamps as DatetimeWithNanoseconds)."""
+    ts = DatetimeWithNanoseconds(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"note{i:06d}",
+            "user_id": "user-1",
+            "title": f"Note {i}",
+            "content": "Lorem ipsum dolor sit amet. " * 8,
+            "is_pinned": i % 10 == 0,
+            "created_at": ts,
+            "updated_at": ts,
+        }
+        for i in range(count)
+    ]
+
+
+def _model_path(notes: list[dict]) -> bytes:
+    """Previous path: build models, then FastAPI re-validates against response_model and encodes."""
+    models = [
+        NoteResponse(
+            id=n["id"],
+            user_id=n.get("user_id", ""),
+            title=n.get("title", ""),
+            content=n.get("content", ""),
+            is_pinned=bool(n.get("is_pinned", False)),
+            created_at=n.get("created_at"),
+            updated_at=n.get("updated_at"),
+        )
+        for n in notes
+    ]
+    adapter = TypeAdapter(list[NoteResponse])
+    validated = adapter.validate_python([m.model_dump() for m in models])
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _dict_path(notes: list[dict]) -> bytes:
+    """Current path: plain dicts, timestamps converted once, FastJSONResponse encoder."""
+    return dumps([_note_to_response(n) for n in notes])
+
+
+def _bench(fn, notes: list[dict]) -> float:
+    fn(notes)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(notes)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main() -> None:
+    notes = _make_notes(NOTE_COUNT)
+    old_ms = _bench(_model_path, notes)
+    new_ms = _bench(_dict_path, notes)
+    print(f"notes={NOTE_COUNT} rounds={ROUNDS}")
+    print(f"model + response_model validation: {old_ms:8.2f} ms/list")
+    print(f"dict + fast JSON response:         {new_ms:8.2f} ms/list")
+    print(f"speedup: {old_ms / new_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Local stand-in for Firebase Auth: RS256 ID tokens and the signInWithPassword REST call.
+
+Tokens are signed with a locally generated key whose certificate is injected into
+``app.core.id_token.key_store``, so the app verifies them in-process exactly like
+real Firebase tokens. ``transport`` answers signInWithPassword for seeded users.
+"""
+
+import datetime
+import json
+import time
+import uuid
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from app.core.id_token import ISSUER_PREFIX
+
+KEY_ID = "bench-key"
+
+
+def _self_signed_cert(key: rsa.RSAPrivateKey) -> str:
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "bench-securetoken")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class FakeFirebaseAuth:
+    """Issues Firebase-shaped ID tokens for seeded users and serves signInWithPassword."""
+
+    def __init__(self, project_id: str, token_lifetime: int = 3600, key_id: str = KEY_ID) -> None:
+        self.project_id = project_id
+        self.token_lifetime = token_lifetime
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        self._signer = crypt.RSASigner.from_string(pem, key_id=key_id)
+        self.certs = {key_id: _self_signed_cert(key)}
+        self.users: dict[str, tuple[str, str]] = {}  # email -> (password, uid)
+
+    def add_user(self, email: str, password: str) -> str:
+        """Seed a user; returns its uid."""
+        uid = uuid.uuid4().hex[:28]
+        self.users[email] = (password, uid)
+        return uid
+
+    def issue_token(self, uid: str, **overrides) -> str:
+        """Signed ID token for uid (same claims as Firebase Auth, updated with ``overrides``)."""
+        now = int(time.time())
+        claims = {
+            "iss": f"{ISSUER_PREFIX}{self.project_id}",
+            "aud": self.project_id,
+            "auth_time": now,
+            "user_id": uid,
+            "sub": uid,
+            "iat": now,
+            "exp": now + self.token_lifetime,
+            "firebase": {"sign_in_provider": "password"},
+            **overrides,
+        }
+        return jwt.encode(self._signer, claims).decode()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("accounts:signInWithPassword"):
+            return httpx.Response(404, json={"error": {"message": "NOT_FOUND"}})
+        body = json.loads(request.content)
+        user = self.users.get(body.get("email", ""))
+        if user is None or user[0] != body.get("password"):
+            return httpx.Response(400, json={"error": {"message": "INVALID_LOGIN_CREDENTIALS"}})
+        uid = user[1]
+        return httpx.Response(
+            200,
+            json={
+                "idToken": self.issue_token(uid),
+                "refreshToken": uuid.uuid4().hex,
+                "localId": uid,
+                "email": body["email"],
+                "expiresIn": str(self.token_lifetime),
+            },
+        )
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        """Transport for ``init_http_client`` that answers Firebase Auth REST calls."""
+        return httpx.MockTransport(self._handle)
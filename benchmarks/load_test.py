@@ -0,0 +1,371 @@
+"""Load test for the notes and auth APIs against local stand-ins for Firestore and Firebase Auth.
+
+Boots ``app.main:app`` in-process (lifespan included) with STORAGE_BACKEND=memory
+(override with the env var, e.g. sqlite) and ``FakeFirebaseAuth``, then drives
+concurrent workloads over an ASGI transport and reports req/s and latency
+percentiles per endpoint.
+
+    python -m benchmarks.load_test --workload all --concurrency 32 --duration 10
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --compare benchmarks/baseline.json --max-regression 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ID = "bench-project"
+
+# Settings are read at import time: configure the app before importing it.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("FIREBASE_PROJECT_ID", PROJECT_ID)
+os.environ.setdefault("FIREBASE_WEB_API_KEY", "bench-api-key")
+os.environ.setdefault("FIREBASE_CREDENTIALS_PATH", "./config/.bench-no-credentials.json")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# The benchmark measures capacity: a few users far above the per-user rate limit.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.core.http import init_http_client  # noqa: E402
+from app.core.id_token import key_store  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import NoteCreate  # noqa: E402
+from app.services import note_firestore_service  # noqa: E402
+from benchmarks.fake_firebase import FakeFirebaseAuth  # noqa: E402
+
+WORKLOADS = ("list_heavy", "write_heavy", "large_content", "login_burst")
+PERCENTILES = (50, 95, 99)
+PASSWORD = "bench-password"
+
+
+@dataclass
+class BenchUser:
+    email: str
+    uid: str
+    token: str
+    note_ids: list[str] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class Recorder:
+    """Latencies (seconds) and error counts per endpoint."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(
+        self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        """Send one request and record it under endpoint (e.g. "GET /notes/{id}")."""
+        start = time.perf_counter()
+        resp = await client.request(method, url, **kwargs)
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        if resp.status_code >= 400:
+            self.errors[endpoint] += 1
+        return resp
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    """Per-endpoint and total count, errors, req/s and latency percentiles (ms)."""
+    endpoints = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        stats = {
+            "count": len(values),
+            "errors": recorder.errors.get(endpoint, 0),
+            "rps": round(len(values) / elapsed, 1),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+        for pct in PERCENTILES:
+            stats[f"p{pct}_ms"] = round(_percentile(values, pct) * 1000, 3)
+        endpoints[endpoint] = stats
+    total = sum(s["count"] for s in endpoints.values())
+    return {
+        "requests": total,
+        "errors": sum(s["errors"] for s in endpoints.values()),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "endpoints": endpoints,
+    }
+
+
+def _note_body(rng: random.Random, content_bytes: int) -> dict:
+    words = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel")
+    content = " ".join(rng.choice(words) for _ in range(content_bytes // 6 + 1))[:content_bytes]
+    return {
+        "title": f"Note {rng.randrange(1_000_000)}",
+        "content": content,
+        "is_pinned": rng.random() < 0.1,
+    }
+
+
+Step = Callable[[httpx.AsyncClient, BenchUser, random.Random, Recorder], Awaitable[None]]
+
+
+def make_step(workload: str, args: argparse.Namespace) -> Step:
+    """One iteration of a workload: picks and sends the next request(s) for a user."""
+
+    async def create(client, user, rng, rec, content_bytes=args.content_bytes):
+        body = _note_body(rng, content_bytes)
+        resp = await rec.request(client, "POST /notes", "POST", "/notes", json=body, headers=user.headers)
+        if resp.status_code == 201:
+            user.note_ids.append(resp.json()["id"])
+
+    async def get_one(client, user, rng, rec):
+        if not user.note_ids:
+            return await create(client, user, rng, rec)
+        note_id = rng.choice(user.note_ids)
+        await rec.request(client, "GET /notes/{id}", "GET", f"/notes/{note_id}", headers=user.headers)
+
+    async def list_page(client, user, rng, rec, limit=args.page_size):
+        await rec.request(client, "GET /notes", "GET", f"/notes?limit={limit}", headers=user.headers)
+
+    async def update(client, user, rng, rec):
+        if not user.note_ids:
+            return await create(client, user, rng, rec)
+        note_id = rng.choice(user.note_ids)
+        await rec.request(
+            client,
+            "PUT /notes/{id}",
+            "PUT",
+            f"/notes/{note_id}",
+            json={"title": f"Edited {rng.randrange(1_000_000)}", "is_pinned": rng.random() < 0.1},
+            headers=user.headers,
+        )
+
+    async def delete(client, user, rng, rec):
+        if not user.note_ids:
+            return await create(client, user, rng, rec)
+        note_id = user.note_ids.pop(rng.randrange(len(user.note_ids)))
+        await rec.request(
+            client, "DELETE /notes/{id}", "DELETE", f"/notes/{note_id}", headers=user.headers
+        )
+
+    async def login(client, user, rng, rec):
+        resp = await rec.request(
+            client, "POST /login", "POST", "/login", json={"email": user.email, "password": PASSWORD}
+        )
+        if resp.status_code == 200:
+            # First call with a fresh token: token verification is not cached yet.
+            token = resp.json()["id_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            await rec.request(client, "GET /notes (new token)", "GET", "/notes?limit=1", headers=headers)
+
+    async def create_large(client, user, rng, rec):
+        await create(client, user, rng, rec, content_bytes=args.large_content_bytes)
+
+    mixes: dict[str, list[tuple[float, Callable]]] = {
+        "list_heavy": [(0.8, list_page), (0.1, get_one), (0.1, create)],
+        "write_heavy": [(0.4, create), (0.35, update), (0.15, delete), (0.1, list_page)],
+        "large_content": [(0.4, create_large), (0.4, get_one), (0.2, list_page)],
+        "login_burst": [(1.0, login)],
+    }
+    weights = [w for w, _ in mixes[workload]]
+    actions = [a for _, a in mixes[workload]]
+
+    async def step(client, user, rng, rec):
+        await rng.choices(actions, weights)[0](client, user, rng, rec)
+
+    return step
+
+
+async def run_workload(
+    client: httpx.AsyncClient, users: list[BenchUser], step: Step, args: argparse.Namespace, seed: int
+) -> dict:
+    """Run ``args.concurrency`` workers for ``args.duration`` seconds (after a warmup)."""
+
+    async def drive(recorder: Recorder, deadline: float, worker: int) -> None:
+        rng = random.Random(seed * 1000 + worker)
+        while time.perf_counter() < deadline:
+            await step(client, rng.choice(users), rng, recorder)
+            # The in-process app may complete a request without suspending;
+            # yield so workers interleave like concurrent clients.
+            await asyncio.sleep(0)
+
+    async def phase(recorder: Recorder, seconds: float) -> float:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(drive(recorder, start + seconds, w) for w in range(args.concurrency))
+        )
+        return time.perf_counter() - start
+
+    if args.warmup > 0:
+        await phase(Recorder(), args.warmup)
+    recorder = Recorder()
+    elapsed = await phase(recorder, args.duration)
+    return summarize(recorder, elapsed)
+
+
+async def seed_users(fake_auth: FakeFirebaseAuth, args: argparse.Namespace) -> list[BenchUser]:
+    """Create users in the fake auth and their initial notes directly in storage."""
+    rng = random.Random(0)
+    users = []
+    for i in range(args.users):
+        email = f"bench{i}@example.com"
+        uid = fake_auth.add_user(email, PASSWORD)
+        user = BenchUser(email=email, uid=uid, token=fake_auth.issue_token(uid))
+        for _ in range(args.notes_per_user):
+            note = await note_firestore_service.create_note(
+                uid, NoteCreate(**_note_body(rng, args.content_bytes))
+            )
+            user.note_ids.append(note["id"])
+        users.append(user)
+    return users
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    fake_auth = FakeFirebaseAuth(PROJECT_ID)
+    key_store.set_keys(fake_auth.certs)
+    workloads = WORKLOADS if args.workload == "all" else (args.workload,)
+    results: dict = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage_backend": settings.storage_backend,
+            "notes_layout": settings.notes_layout,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "users": args.users,
+            "notes_per_user": args.notes_per_user,
+            "accept_encoding": args.accept_encoding,
+        },
+        "workloads": {},
+    }
+    async with app.router.lifespan_context(app):
+        await init_http_client(transport=fake_auth.transport)
+        users = await seed_users(fake_auth, args)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://bench",
+            headers={"Accept-Encoding": args.accept_encoding} if args.accept_encoding else None,
+        ) as client:
+            results["meta"]["accept_encoding"] = client.headers.get("Accept-Encoding")
+            for seed, workload in enumerate(workloads):
+                step = make_step(workload, args)
+                summary = await run_workload(client, users, step, args, seed)
+                results["workloads"][workload] = summary
+                print_summary(workload, summary)
+    return results
+
+
+def print_summary(workload: str, summary: dict) -> None:
+    print(
+        f"\n== {workload}: {summary['requests']} requests, {summary['rps']} req/s, "
+        f"{summary['errors']} errors"
+    )
+    print(f"{'endpoint':<26}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for endpoint, s in summary["endpoints"].items():
+        print(
+            f"{endpoint:<26}{s['count']:>8}{s['rps']:>9}{s['p50_ms']:>9}"
+            f"{s['p95_ms']:>9}{s['p99_ms']:>9}{s['errors']:>8}"
+        )
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Endpoints whose p95 grew or req/s dropped by more than max_regression vs. the baseline."""
+    regressions = []
+    for workload, base in baseline.get("workloads", {}).items():
+        current = results["workloads"].get(workload)
+        if current is None:
+            continue
+        for endpoint, b in base["endpoints"].items():
+            c = current["endpoints"].get(endpoint)
+            if c is None:
+                continue
+            if b["p95_ms"] and c["p95_ms"] > b["p95_ms"] * (1 + max_regression):
+                regressions.append(f"{workload} {endpoint}: p95 {b['p95_ms']} -> {c['p95_ms']} ms")
+            if b["rps"] and c["rps"] < b["rps"] * (1 - max_regression):
+                regressions.append(f"{workload} {endpoint}: req/s {b['rps']} -> {c['rps']}")
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workload", choices=("all", *WORKLOADS), default="all")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per workload")
+    parser.add_argument(
+        "--warmup", type=float, default=1.0, help="unrecorded seconds before each workload"
+    )
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--notes-per-user", type=int, default=100, help="seeded notes per user")
+    parser.add_argument("--page-size", type=int, default=50, help="limit for GET /notes")
+    parser.add_argument("--content-bytes", type=int, default=500)
+    parser.add_argument("--large-content-bytes", type=int, default=50_000, help="content size for large_content (API max 50,000)")
+    parser.add_argument(
+        "--accept-encoding",
+        default=None,
+        help="Accept-Encoding sent by clients (default: the HTTP client's own, e.g. gzip, deflate)",
+    )
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--save-baseline", type=Path, help="write results JSON as the new baseline")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="allowed relative p95 increase / req/s drop before failing (with --compare)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2) + "\n")
+            print(f"\nResults written to {path}")
+    if args.compare is not None:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.max_regression)
+        if regressions:
+            print(f"\nRegressions vs {args.compare} (> {args.max_regression:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions vs {args.compare} (threshold {args.max_regression:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Shared fixtures: the app on the in-memory backend with a local Firebase Auth stand-in.
+
+Settings are read at import time, so the environment is set before the app is
+imported. Storage is a process-wide singleton: tests use a fresh uid each, or
+the ``storage`` fixture for a fresh store of each local backend.
+"""
+
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("FIREBASE_PROJECT_ID", "test-project")
+os.environ.setdefault("FIREBASE_WEB_API_KEY", "test-api-key")
+os.environ.setdefault("FIREBASE_CREDENTIALS_PATH", "./config/.test-no-credentials.json")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.core.http import close_http_client, init_http_client  # noqa: E402
+from app.core.id_token import key_store  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import firestore_async_service, note_migration, storage_backend  # noqa: E402
+from app.services.memory_storage import MemoryStorage  # noqa: E402
+from app.services.sqlite_storage import SqliteStorage  # noqa: E402
+from benchmarks.fake_firebase import FakeFirebaseAuth  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def storage(request, tmp_path, monkeypatch) -> storage_backend.StorageBackend:
+    """A fresh, empty store of each local backend in place of the process-wide one."""
+    store = MemoryStorage() if request.param == "memory" else SqliteStorage(str(tmp_path / "store.db"))
+    for module in (storage_backend, firestore_async_service, note_migration):
+        monkeypatch.setattr(module, "local_storage", store)
+    yield store
+    await store.close()
+
+
+@pytest.fixture(scope="session")
+def fake_auth() -> FakeFirebaseAuth:
+    """Firebase Auth stand-in whose signing certificate is loaded into key_store."""
+    fake = FakeFirebaseAuth(settings.firebase_project_id)
+    key_store.set_keys(fake.certs)
+    return fake
+
+
+@pytest.fixture
+async def client(fake_auth):
+    """HTTP client for the app (no lifespan); Firebase Auth REST calls go to fake_auth."""
+    await init_http_client(transport=fake_auth.transport)
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as http:
+            yield http
+    finally:
+        await close_http_client()
+
+
+@pytest.fixture
+def uid(fake_auth) -> str:
+    """A fresh user (its notes start empty)."""
+    return fake_auth.add_user(f"{os.urandom(6).hex()}@example.com", "password")
+
+
+@pytest.fixture
+def headers(fake_auth, uid) -> dict[str, str]:
+    return {"Authorization": f"Bearer {fake_auth.issue_token(uid)}"}
@@ -0,0 +1,58 @@
+"""Storage concurrency limiter: slots per call and per streamed item."""
+
+import pytest
+
+from app.core.admission import ConcurrencyLimiter, limited
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def limiter():
+    return ConcurrencyLimiter(max_in_flight=1, max_waiting=0, wait_timeout=0.1)
+
+
+async def test_stream_holds_no_slot_between_items(limiter):
+    @limited(limiter)
+    async def fetch(i):
+        return i
+
+    @limited(limiter)
+    async def stream(n):
+        for i in range(n):
+            assert limiter.in_flight == 1
+            yield await fetch(i)  # nested: reuses the stream's slot
+
+    seen = []
+    async for item in stream(3):
+        assert limiter.in_flight == 0
+        seen.append(await fetch(item))  # the consumer gets the only slot
+    assert seen == [0, 1, 2]
+    assert limiter.in_flight == 0
+
+
+async def test_closing_a_stream_early_releases_its_slot(limiter):
+    @limited(limiter)
+    async def stream():
+        yield 1
+        yield 2
+
+    items = stream()
+    assert await items.__anext__() == 1
+    await items.aclose()
+    assert limiter.in_flight == 0
+    assert await limiter.acquire() is not None
+
+
+async def test_release_resets_the_held_marker(limiter):
+    @limited(limiter)
+    async def call():
+        return limiter._held.get()
+
+    assert await call() is True
+    assert limiter._held.get() is False
+    token = await limiter.acquire()
+    assert await limiter.acquire() is None  # reentrant
+    limiter.release(token)
+    assert limiter._held.get() is False
+    assert limiter.in_flight == 0
@@ -0,0 +1,87 @@
+"""ID token verification: local (prefetched keys) and the Admin SDK fallback."""
+
+import time
+
+import pytest
+
+from app.core import auth
+from app.core.id_token import ISSUER_PREFIX, key_store
+from benchmarks.fake_firebase import FakeFirebaseAuth
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_valid_token_is_verified_locally(client, fake_auth, uid, monkeypatch):
+    async def sdk_not_called(*args, **kwargs):
+        raise AssertionError("known key id must not fall back to the SDK")
+
+    monkeypatch.setattr(auth, "run_blocking", sdk_not_called)
+    resp = await client.get(
+        "/notes", headers={"Authorization": f"Bearer {fake_auth.issue_token(uid)}"}
+    )
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+async def test_expired_token_is_rejected(client, fake_auth, uid):
+    past = int(time.time()) - 7200
+    token = fake_auth.issue_token(uid, iat=past, auth_time=past, exp=past + 3600)
+    resp = await client.get("/notes", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 401
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [{"aud": "other-project"}, {"iss": f"{ISSUER_PREFIX}other-project"}],
+    ids=["wrong_aud", "wrong_iss"],
+)
+async def test_token_for_another_project_is_rejected(client, fake_auth, uid, claims):
+    token = fake_auth.issue_token(uid, **claims)
+    resp = await client.get("/notes", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 401
+
+
+async def test_missing_token_is_rejected(client):
+    resp = await client.get("/notes")
+    assert resp.status_code == 401
+
+
+async def test_unknown_key_id_falls_back_to_sdk(client, uid, monkeypatch):
+    other = FakeFirebaseAuth("test-project", key_id="rotated-key")
+    token = other.issue_token(uid)
+    assert not key_store.has_key("rotated-key")
+    calls = []
+    refreshes = []
+
+    async def fake_run_blocking(func, *args, **kwargs):
+        calls.append((func, args, kwargs))
+        return {"uid": uid}
+
+    monkeypatch.setattr(auth, "run_blocking", fake_run_blocking)
+    monkeypatch.setattr(key_store, "request_refresh", lambda: refreshes.append(True))
+    resp = await client.get("/notes", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert len(calls) == 1
+    assert calls[0][1] == (token,)
+    assert refreshes == [True]
+
+
+async def test_login_signs_in_through_shared_http_client(client, fake_auth):
+    uid = fake_auth.add_user("login@example.com", "secret-password")
+    resp = await client.post(
+        "/login", json={"email": "login@example.com", "password": "secret-password"}
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["uid"] == uid
+    assert body["email"] == "login@example.com"
+    notes = await client.get("/notes", headers={"Authorization": f"Bearer {body['id_token']}"})
+    assert notes.status_code == 200
+
+
+async def test_login_with_wrong_password_is_rejected(client, fake_auth):
+    fake_auth.add_user("wrong-password@example.com", "secret-password")
+    resp = await client.post(
+        "/login", json={"email": "wrong-password@example.com", "password": "not-it"}
+    )
+    assert resp.status_code == 401
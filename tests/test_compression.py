@@ -0,0 +1,77 @@
+"""Compression in bounded slices: note content at rest and response bodies."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.core.response_compression import CompressionMiddleware
+from app.models import NoteCreate, NoteUpdate
+from app.services import note_firestore_service
+
+pytestmark = pytest.mark.anyio
+
+LARGE = "lorem ipsum dolor sit amet " * 1800  # 48,600 characters (API max 50,000)
+
+
+@pytest.fixture
+def yields(monkeypatch):
+    """Count the zero-second sleeps (event loop yields)."""
+    calls = []
+    sleep = asyncio.sleep
+
+    async def counting(delay, *args, **kwargs):
+        if delay == 0:
+            calls.append(delay)
+        return await sleep(delay, *args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "sleep", counting)
+    return calls
+
+
+async def test_note_content_round_trips_compressed(uid):
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="big", content=LARGE))
+    assert (await note_firestore_service.get_note(uid, note["id"]))["content"] == LARGE
+    updated = await note_firestore_service.update_note(uid, note["id"], NoteUpdate(title="x"))
+    assert updated["content"] == LARGE
+
+
+async def test_inflating_a_page_yields_between_slices(uid, yields, monkeypatch):
+    for i in range(3):
+        await note_firestore_service.create_note(uid, NoteCreate(title=str(i), content=LARGE))
+    monkeypatch.setattr(note_firestore_service.settings, "compression_inline_max_bytes", 64)
+    yields.clear()
+    notes, _ = await note_firestore_service.list_notes(uid, limit=3)
+    assert [n["content"] for n in notes] == [LARGE] * 3
+    assert len(yields) == 2  # between the notes, never in the middle of one
+
+
+async def test_small_page_is_inflated_in_one_step(uid, yields):
+    for i in range(3):
+        await note_firestore_service.create_note(uid, NoteCreate(title=str(i), content="small"))
+    yields.clear()
+    notes, _ = await note_firestore_service.list_notes(uid, limit=3)
+    assert [n["content"] for n in notes] == ["small"] * 3
+    assert yields == []
+
+
+def _app(body: bytes) -> Starlette:
+    async def endpoint(request):
+        return Response(body, media_type="application/json")
+
+    return Starlette(routes=[Route("/", endpoint)])
+
+
+@pytest.mark.parametrize("size, slices", [(100_000, 4), (2_000, 1)])
+async def test_response_compression_yields_between_slices(yields, size, slices):
+    body = json.dumps("x" * (size - 2)).encode()  # exactly size bytes
+    app = CompressionMiddleware(_app(body), minimum_size=1024, inline_max_bytes=32 * 1024)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as c:
+        resp = await c.get("/", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.content == body  # decoded by the client
+    assert len(yields) == slices - 1
@@ -0,0 +1,50 @@
+"""Logging pipeline: sampling on the app loggers, process-wide settings untouched."""
+
+import logging
+
+import pytest
+
+from app.core import log_config
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setattr(log_config.settings, "log_level", "INFO")
+    monkeypatch.setattr(
+        log_config.settings, "log_sample_rates", {"app.test.sampled": 0.0, "app.test.kept": 1.0}
+    )
+    sampled = logging.getLogger("app.test.sampled.child")
+    kept = logging.getLogger("app.test.kept")
+    level = logging.getLogger(log_config.APP_LOGGER).level
+    log_config.configure_logging()
+    try:
+        yield sampled, kept
+    finally:
+        log_config.shutdown_logging()
+        logging.getLogger(log_config.APP_LOGGER).setLevel(level)
+
+
+def test_sampling_is_a_filter_on_the_sampled_loggers(pipeline):
+    sampled, kept = pipeline
+    assert any(isinstance(f, log_config.SamplingFilter) for f in sampled.filters)
+    assert not kept.filters
+    assert not log_config._handler.filters
+
+    before = log_config.get_logging_stats()
+    sampled.info("dropped")
+    sampled.warning("kept")
+    kept.info("kept")
+    stats = log_config.get_logging_stats()
+    assert stats["sampled_out"] == before["sampled_out"] + 1
+    assert stats["enqueued"] == before["enqueued"] + 2
+
+
+def test_process_wide_logging_settings_are_untouched(pipeline):
+    assert logging.logThreads and logging.logProcesses and logging.logMultiprocessing
+    assert logging._srcfile is not None
+
+
+def test_shutdown_removes_the_sampling_filter(pipeline):
+    sampled, _ = pipeline
+    log_config.shutdown_logging()
+    assert not sampled.filters
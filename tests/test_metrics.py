@@ -0,0 +1,73 @@
+"""GET /metrics: latency histograms and stats gauges in Prometheus text format."""
+
+import re
+
+import pytest
+
+from app.config import settings
+from app.core.metrics import Histogram
+
+pytestmark = pytest.mark.anyio
+
+_SAMPLE = re.compile(r"^(\w+)(?:{(.*)})? (\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _parse(text: str) -> dict[tuple[str, frozenset], float]:
+    """Samples of a scrape: (name, labels) -> value; comment lines are skipped."""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, labels, value = _SAMPLE.match(line).groups()
+        samples[(name, frozenset(_LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+async def _scrape(client) -> dict[tuple[str, frozenset], float]:
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return _parse(resp.text)
+
+
+def _labels(**labels: str) -> frozenset:
+    return frozenset(labels.items())
+
+
+async def test_requests_and_storage_calls_are_observed(client, headers):
+    created = await client.post("/notes", json={"title": "a", "content": ""}, headers=headers)
+    before = await _scrape(client)
+    resp = await client.get(f"/notes/{created.json()['id']}", headers=headers)
+    assert resp.status_code == 200
+    after = await _scrape(client)
+
+    def delta(name: str, labels: frozenset) -> float:
+        return after[(name, labels)] - before.get((name, labels), 0)
+
+    # The route label is the template, not the note id.
+    route = _labels(method="GET", route="/notes/{id}", status="200")
+    assert delta("http_request_duration_seconds_count", route) == 1
+    assert delta("http_request_duration_seconds_bucket", route | {("le", "+Inf")}) == 1
+    assert after[("http_request_duration_seconds_sum", route)] > 0
+    assert not any(
+        dict(labels).get("route", "").endswith(created.json()["id"]) for _, labels in after
+    )
+
+    read = _labels(operation="get_document", backend=settings.storage_backend, outcome="ok")
+    assert delta("storage_operation_duration_seconds_count", read) >= 1
+    assert ("note_singleflight_calls", frozenset()) in after
+    assert ("storage_limit_in_flight", frozenset()) in after
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("op_seconds", "Test.", ("op",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(seconds, 'say "hi"')
+
+    samples = _parse("\n".join(histogram.render()))
+    op = _labels(op='say \\"hi\\"')
+    buckets = [samples[("op_seconds_bucket", op | {("le", le)})] for le in ("0.1", "1.0", "+Inf")]
+    assert buckets == [1, 3, 4]
+    assert samples[("op_seconds_count", op)] == 4
+    assert samples[("op_seconds_sum", op)] == pytest.approx(6.05)
@@ -0,0 +1,131 @@
+"""Layout migration (note_migration) and dual-layout writes on each local backend."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.models import NoteCreate, NoteUpdate
+from app.services import note_firestore_service, note_migration
+from app.services.firestore_async_service import WriteOp, commit_writes, get_document
+from app.services.note_firestore_service import COLLECTION, LAYOUT_DUAL, LAYOUT_GLOBAL
+from app.services.sqlite_storage import SqliteStorage
+
+pytestmark = pytest.mark.anyio
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def dual(storage, monkeypatch):
+    monkeypatch.setattr(note_firestore_service, "LAYOUT", LAYOUT_DUAL)
+    monkeypatch.setattr(settings, "notes_layout", LAYOUT_DUAL)
+    return storage
+
+
+def _legacy(note_id: str, user_id: str | None) -> WriteOp:
+    data = {"title": note_id, "content": ""}
+    if user_id is not None:
+        data["user_id"] = user_id
+    return WriteOp("set", COLLECTION, note_id, data)
+
+
+async def _checkpoint() -> dict | None:
+    return await get_document(note_migration.CHECKPOINT_COLLECTION, note_migration.CHECKPOINT_ID)
+
+
+def _moved(note_id: str, user_id: str) -> tuple[str, str]:
+    return note_firestore_service.user_notes_collection(user_id), note_id
+
+
+async def test_migration_moves_notes_and_a_second_run_is_a_no_op(dual):
+    await commit_writes([_legacy(f"n{i}", "u1") for i in range(5)] + [_legacy("orphan", None)])
+
+    state = await note_migration.migrate_notes(batch_size=2)
+    assert (state["moved"], state["skipped"], state["completed"]) == (5, 1, True)
+    for i in range(5):
+        assert await get_document(COLLECTION, f"n{i}") is None
+        assert (await get_document(*_moved(f"n{i}", "u1")))["title"] == f"n{i}"
+    # The orphan has no owner to move it to: it stays where it is.
+    assert (await get_document(COLLECTION, "orphan"))["title"] == "orphan"
+    checkpoint = await _checkpoint()
+    assert checkpoint["completed"] and checkpoint["moved"] == 5
+
+    again = await note_migration.migrate_notes(batch_size=2)
+    assert (again["moved"], again["skipped"], again["completed"]) == (0, 1, True)
+
+
+async def test_interrupted_migration_resumes_after_its_checkpoint(dual):
+    await commit_writes([_legacy(f"n{i}", "u1") for i in range(5)])
+
+    dry = await note_migration.migrate_notes(batch_size=2, dry_run=True)
+    assert (dry["moved"], dry["completed"]) == (5, True)
+    assert await _checkpoint() is None
+
+    first = await note_migration.migrate_notes(batch_size=2, max_batches=1)
+    assert (first["moved"], first["last_id"], first["completed"]) == (2, "n1", False)
+    rest = await note_migration.migrate_notes(batch_size=2)
+    assert (rest["moved"], rest["completed"]) == (5, True)  # counts carry over from the checkpoint
+
+
+@pytest.mark.parametrize("write", ["update", "delete"])
+async def test_dual_layout_moves_a_global_note_before_writing_it(uid, storage, monkeypatch, write):
+    monkeypatch.setattr(note_firestore_service, "LAYOUT", LAYOUT_GLOBAL)
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="a", content=""))
+    monkeypatch.setattr(note_firestore_service, "LAYOUT", LAYOUT_DUAL)
+
+    if write == "update":
+        await note_firestore_service.update_note(uid, note["id"], NoteUpdate(title="b"))
+        assert (await get_document(*_moved(note["id"], uid)))["title"] == "b"
+    else:
+        await note_firestore_service.delete_note(uid, note["id"])
+        assert await get_document(*_moved(note["id"], uid)) is None
+    assert await get_document(COLLECTION, note["id"]) is None
+
+
+def test_cli_refuses_to_run_outside_the_dual_layout(monkeypatch):
+    monkeypatch.setattr(settings, "notes_layout", LAYOUT_GLOBAL)
+    with pytest.raises(SystemExit):
+        note_migration.parse_args([])
+    assert note_migration.parse_args(["--dry-run"]).dry_run
+    assert note_migration.parse_args(["--force", "--batch-size", "10"]).batch_size == 10
+
+
+async def test_cli_migrates_a_sqlite_store(tmp_path):
+    path = str(tmp_path / "store.db")
+    seed = SqliteStorage(path)
+    seed._commit({(COLLECTION, "n1"): {"title": "a", "user_id": "u1"}})
+    seed._commit({(COLLECTION, "orphan"): {"title": "b"}})
+    await seed.close()
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": "sqlite",
+        "STORAGE_SQLITE_PATH": path,
+        "NOTES_LAYOUT": LAYOUT_DUAL,
+    }
+
+    def run() -> tuple[int, int, bool]:
+        out = subprocess.run(
+            [sys.executable, "-m", "app.services.note_migration", "--pause", "0"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        state = json.loads(out.stdout)
+        return state["moved"], state["skipped"], state["completed"]
+
+    assert run() == (1, 1, True)
+    assert run() == (0, 1, True)  # the orphan is left in place
+    store = SqliteStorage(path)
+    try:
+        assert store._load(*_moved("n1", "u1")) == {"title": "a", "user_id": "u1"}
+        assert store._load(COLLECTION, "orphan") == {"title": "b"}
+        assert store._load(COLLECTION, "n1") is None
+    finally:
+        await store.close()
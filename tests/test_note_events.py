@@ -0,0 +1,59 @@
+"""Note event fan-out (GET /notes/stream) on the in-memory storage watcher."""
+
+import pytest
+
+from app.models import NoteCreate, NoteUpdate
+from app.services import note_firestore_service
+from app.services.note_events import CLOSED, OVERFLOW, NoteEventHub
+from app.services.note_firestore_service import watch_notes
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_changes_fan_out_to_every_connection_of_the_user(uid):
+    hub = NoteEventHub(watch_notes, queue_size=16)
+    first, second = hub.subscribe(uid), hub.subscribe(uid)
+    other = hub.subscribe(f"{uid}-other")
+    assert hub.stats()["users"] == 2
+
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="a", content="b"))
+    await note_firestore_service.update_note(uid, note["id"], NoteUpdate(title="c"))
+    await note_firestore_service.delete_note(uid, note["id"])
+
+    for subscription in (first, second):
+        kinds = [(await subscription.get(timeout=1))[0] for _ in range(3)]
+        assert kinds == ["upsert", "upsert", "delete"]
+        assert await subscription.get(timeout=0) is None
+    assert await other.get(timeout=0) is None
+
+    hub.close()
+    assert await first.get(timeout=1) == CLOSED
+    assert hub.stats()["connections"] == 0
+
+
+async def test_upsert_events_carry_the_note(uid):
+    hub = NoteEventHub(watch_notes, queue_size=16)
+    subscription = hub.subscribe(uid)
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="t", content="body"))
+    kind, data = await subscription.get(timeout=1)
+    assert kind == "upsert"
+    assert (data["id"], data["title"], data["content"]) == (note["id"], "t", "body")
+    hub.unsubscribe(subscription)
+
+
+async def test_slow_connection_is_dropped_with_overflow(uid):
+    hub = NoteEventHub(watch_notes, queue_size=2)
+    slow, fast = hub.subscribe(uid), hub.subscribe(uid)
+
+    for i in range(3):
+        await note_firestore_service.create_note(uid, NoteCreate(title=str(i), content=""))
+        assert (await fast.get(timeout=1))[0] == "upsert"
+
+    assert await slow.get(timeout=1) == OVERFLOW
+    assert slow.closed
+    assert await slow.get(timeout=0) is None
+    assert hub.stats()["connections"] == 1
+    assert hub.stats()["dropped_slow"] == 1
+
+    hub.unsubscribe(fast)
+    assert hub.stats()["users"] == 0
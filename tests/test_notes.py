@@ -0,0 +1,203 @@
+"""Note service: paging, write-through caches and sync on each local backend."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import NoteCreate, NoteUpdate
+from app.models.note import NoteBatchCreate
+from app.services import note_firestore_service
+from app.services.firestore_async_service import (
+    WriteOp,
+    commit_writes,
+    get_document,
+    new_document_id,
+)
+from app.services.note_cache import note_cache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def backend(storage):
+    """Every test runs on a fresh store of each local backend."""
+    return storage
+
+
+async def _all_pages(user_id: str, limit: int) -> list[str]:
+    ids: list[str] = []
+    cursor = None
+    while True:
+        notes, cursor = await note_firestore_service.list_notes(user_id, limit, cursor)
+        ids.extend(note["id"] for note in notes)
+        if cursor is None:
+            return ids
+
+
+async def test_pages_past_a_note_without_created_at(uid, backend):
+    notes = [
+        await note_firestore_service.create_note(uid, NoteCreate(title=str(i), content=""))
+        for i in range(3)
+    ]
+    legacy = notes[1]["id"]
+    # Written as another client would (the service never stores a null timestamp).
+    collection = note_firestore_service._notes_collection(uid)
+    doc = await get_document(collection, legacy)
+    del doc["id"]
+    backend._commit({(collection, legacy): {**doc, "created_at": None}})
+    expected = [notes[2]["id"], notes[0]["id"], legacy]  # newest first, null last
+
+    # Uncached: each page is a storage query resumed from the cursor.
+    assert await _all_pages(uid, 1) == expected
+    # Cached: the full list fills note_cache, then pages are sliced from it.
+    assert [n["id"] for n in (await note_firestore_service.list_notes(uid))[0]] == expected
+    assert await _all_pages(uid, 1) == expected
+
+
+async def test_cursor_of_a_note_without_created_at_round_trips():
+    cursor = note_firestore_service.encode_cursor({"id": "n1", "is_pinned": False})
+    assert note_firestore_service.decode_cursor(cursor) == {
+        "is_pinned": False,
+        "created_at": None,
+        "__name__": "n1",
+    }
+
+
+async def _write_elsewhere(user_id: str, title: str) -> str:
+    """Create a note as another instance would: committed, but unseen by this one's caches."""
+    collection = note_firestore_service._notes_collection(user_id)
+    note_id = new_document_id(collection)
+    payload = note_firestore_service._create_payload(user_id, NoteCreate(title=title, content=""))
+    await commit_writes(
+        [
+            WriteOp("set", collection, note_id, payload),
+            note_firestore_service._version_write(user_id, note_firestore_service._new_version()),
+        ]
+    )
+    return note_id
+
+
+async def _listed_ids(user_id: str) -> set[str]:
+    notes, _ = await note_firestore_service.list_notes(user_id)
+    return {note["id"] for note in notes}
+
+
+async def test_local_writes_update_the_cached_list_in_place(uid):
+    first = await note_firestore_service.create_note(uid, NoteCreate(title="a", content=""))
+    assert await _listed_ids(uid) == {first["id"]}
+    second = await note_firestore_service.create_note(uid, NoteCreate(title="b", content=""))
+    await note_firestore_service.update_note(uid, first["id"], NoteUpdate(title="c"))
+
+    version, notes = await note_cache.get(uid)
+    assert version == await note_firestore_service.get_notes_version(uid)
+    assert [(n["id"], n["title"]) for n in notes] == [(second["id"], "b"), (first["id"], "c")]
+
+
+@pytest.mark.parametrize("local_write", ["create", "update", "delete", "batch"])
+async def test_cached_list_behind_another_instance_is_not_retagged(uid, local_write):
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="a", content=""))
+    assert await _listed_ids(uid) == {note["id"]}  # cached
+    elsewhere = await _write_elsewhere(uid, "from another instance")
+
+    expected = {note["id"], elsewhere}
+    if local_write == "create":
+        created = await note_firestore_service.create_note(uid, NoteCreate(title="b", content=""))
+        expected.add(created["id"])
+    elif local_write == "update":
+        await note_firestore_service.update_note(uid, note["id"], NoteUpdate(title="b"))
+    elif local_write == "delete":
+        await note_firestore_service.delete_note(uid, note["id"])
+        expected.discard(note["id"])
+    else:
+        results = await note_firestore_service.batch_notes(
+            uid, [NoteBatchCreate(op="create", data=NoteCreate(title="b", content=""))]
+        )
+        expected.add(results[0]["id"])
+
+    assert await _listed_ids(uid) == expected
+
+
+async def _found_ids(user_id: str, query: str) -> set[str]:
+    results, _ = await note_firestore_service.search_notes(user_id, query, limit=100)
+    return {result["id"] for result in results}
+
+
+async def test_search_index_follows_local_writes(uid):
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="milk", content=""))
+    assert await _found_ids(uid, "milk") == {note["id"]}
+    await note_firestore_service.update_note(uid, note["id"], NoteUpdate(title="eggs"))
+    assert await _found_ids(uid, "milk") == set()
+    assert await _found_ids(uid, "eggs") == {note["id"]}
+
+
+@pytest.mark.parametrize("local_write", ["create", "delete"])
+async def test_search_index_behind_another_instance_is_rebuilt(uid, local_write):
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="milk", content=""))
+    assert await _found_ids(uid, "milk") == {note["id"]}  # index built
+    elsewhere = await _write_elsewhere(uid, "milk from another instance")
+
+    expected = {note["id"], elsewhere}
+    if local_write == "create":
+        created = await note_firestore_service.create_note(uid, NoteCreate(title="milk", content=""))
+        expected.add(created["id"])
+    else:
+        await note_firestore_service.delete_note(uid, note["id"])
+        expected.discard(note["id"])
+
+    assert await _found_ids(uid, "milk") == expected
+
+
+async def test_changes_page_through_timestamp_ties(uid, monkeypatch):
+    tie = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr(note_firestore_service, "_timestamp", lambda: tie)
+    created = [
+        (await note_firestore_service.create_note(uid, NoteCreate(title=str(i), content="")))["id"]
+        for i in range(5)
+    ]
+    for note_id in created[:2]:
+        await note_firestore_service.delete_note(uid, note_id)
+
+    changed, deleted = [], []
+    cursor = None
+    for _ in range(10):
+        notes, tombstones, watermark, cursor = await note_firestore_service.list_changes(
+            uid, None, 2, cursor
+        )
+        changed += [note["id"] for note in notes]
+        deleted += [tombstone["id"] for tombstone in tombstones]
+        if cursor is None:
+            break
+        # Ties are still pending: a client resuming from the watermark must not skip them.
+        assert watermark == tie - timedelta(microseconds=1)
+    assert sorted(changed) == sorted(created[2:])
+    assert sorted(deleted) == sorted(created[:2])
+    assert watermark == tie
+    assert cursor is None
+
+
+async def test_changes_reject_a_malformed_cursor(client, headers):
+    resp = await client.get("/notes/changes", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert resp.status_code == 400
+
+
+async def _batch(client, headers, operations):
+    return await client.post("/notes:batch", json={"operations": operations}, headers=headers)
+
+
+async def test_batch_of_deletes_must_fit_in_one_commit(client, headers):
+    creates = [{"op": "create", "data": {"title": str(i), "content": ""}} for i in range(250)]
+    resp = await _batch(client, headers, creates)
+    assert resp.status_code == 200
+    ids = [result["id"] for result in resp.json()["results"]]
+
+    # 250 deletes + 250 tombstones + the version marker = 501 writes
+    resp = await _batch(client, headers, [{"op": "delete", "id": note_id} for note_id in ids])
+    assert resp.status_code == 400
+    assert "501 writes" in resp.json()["detail"]
+    listed = await client.get("/notes", params={"limit": 1}, headers=headers)
+    assert listed.json()  # nothing was deleted
+
+    # 249 deletes: 499 writes
+    resp = await _batch(client, headers, [{"op": "delete", "id": note_id} for note_id in ids[:249]])
+    assert resp.status_code == 200
+    assert {result["status"] for result in resp.json()["results"]} == {204}
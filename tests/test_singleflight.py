@@ -0,0 +1,86 @@
+"""Single-flight note reads: concurrent identical reads share one storage call."""
+
+import asyncio
+
+import pytest
+
+from app.models import NoteCreate, NoteUpdate
+from app.services import note_firestore_service
+from app.services.note_firestore_service import note_reads
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Document reads of the note service; the first one is held until ``reads.gate`` is set."""
+
+    class Reads(list):
+        def __init__(self) -> None:
+            super().__init__()
+            self.gate = asyncio.Event()
+            self.error: Exception | None = None
+
+    seen = Reads()
+    get_document = note_firestore_service.get_document
+
+    async def held(collection, document_id, *args, **kwargs):
+        seen.append(document_id)
+        doc = await get_document(collection, document_id, *args, **kwargs)
+        if len(seen) == 1:
+            await seen.gate.wait()
+        if seen.error is not None:
+            raise seen.error
+        return doc
+
+    monkeypatch.setattr(note_firestore_service, "get_document", held)
+    return seen
+
+
+async def _until(condition) -> None:
+    while not condition():
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_identical_reads_make_one_storage_call(uid, reads):
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="a", content=""))
+    merged = note_reads.merged
+
+    tasks = [asyncio.create_task(note_firestore_service.get_note(uid, note["id"])) for _ in range(5)]
+    await _until(lambda: reads)
+    await asyncio.sleep(0)  # the other callers join the first one
+    reads.gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert reads == [note["id"]]
+    assert [result["title"] for result in results] == ["a"] * 5
+    assert note_reads.merged - merged == 4
+
+
+async def test_a_write_between_two_reads_forces_a_fresh_read(uid, reads):
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="a", content=""))
+
+    before = asyncio.create_task(note_firestore_service.get_note(uid, note["id"]))
+    await _until(lambda: reads)  # read, held before returning
+    await note_firestore_service.update_note(uid, note["id"], NoteUpdate(title="b"))
+    after = await note_firestore_service.get_note(uid, note["id"])
+    reads.gate.set()
+
+    assert after["title"] == "b"  # not the read in flight when the write committed
+    assert (await before)["title"] == "a"
+    assert reads == [note["id"], note["id"]]
+
+
+async def test_an_error_reaches_every_waiter(uid, reads):
+    note = await note_firestore_service.create_note(uid, NoteCreate(title="a", content=""))
+    reads.error = RuntimeError("storage unavailable")
+
+    tasks = [asyncio.create_task(note_firestore_service.get_note(uid, note["id"])) for _ in range(3)]
+    await _until(lambda: reads)
+    await asyncio.sleep(0)
+    reads.gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert results == [reads.error] * 3
+    assert reads == [note["id"]]
+    assert not note_reads.stats()["in_flight"]
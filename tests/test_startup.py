@@ -0,0 +1,38 @@
+"""Startup: importing the app leaves the Firebase SDK stack to the lifespan."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SDK_PACKAGES = ("firebase_admin", "grpc", "google.cloud", "google.auth", "google.api_core")
+
+
+def _sdk_modules_after_import(**env: str) -> list[str]:
+    """SDK modules in sys.modules after ``import app.main`` in a fresh interpreter."""
+    script = (
+        "import json, sys\n"
+        "import app.main\n"
+        f"print(json.dumps([m for m in sys.modules if m.startswith({SDK_PACKAGES!r})]))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env={**os.environ, "STORAGE_BACKEND": "firestore", **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def test_importing_the_app_defers_the_sdk():
+    assert _sdk_modules_after_import() == []
+
+
+def test_eager_imports_load_the_sdk():
+    modules = _sdk_modules_after_import(STARTUP_LAZY_IMPORTS="false")
+    assert {"firebase_admin", "grpc"} <= set(modules)
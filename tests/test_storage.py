@@ -0,0 +1,97 @@
+"""Storage layer (firestore_async_service) on each local backend (see the storage fixture)."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from app.services.firestore_async_service import (
+    MAX_WRITES_PER_COMMIT,
+    WriteOp,
+    commit_writes,
+    get_document,
+    get_documents,
+    list_documents_where,
+    run_in_transaction,
+    set_document,
+    stream_documents_where,
+    update_document,
+)
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _sets(collection: str, count: int) -> list[WriteOp]:
+    return [WriteOp("set", collection, f"d{i:04d}", {"i": i}) for i in range(count)]
+
+
+async def test_documents_round_trip_with_their_types(storage):
+    data = {"s": "text", "n": 3, "f": 1.5, "b": True, "at": T0, "blob": b"\x00\xff", "m": {"k": [1, "x"]}}
+    await set_document("things", "a", data)
+    assert await get_document("things", "a") == {**data, "id": "a"}
+    await set_document("things", "a", {"m": {"j": 2}}, merge=True)
+    assert (await get_document("things", "a"))["m"] == {"k": [1, "x"], "j": 2}
+    assert await get_documents("things", ["a", "missing"]) == {
+        "a": await get_document("things", "a"),
+        "missing": None,
+    }
+
+
+async def test_update_of_a_missing_document_fails(storage):
+    with pytest.raises(api_exceptions.NotFound):
+        await update_document("things", "missing", {"x": 1})
+    with pytest.raises(api_exceptions.NotFound):
+        await commit_writes([WriteOp("set", "things", "a", {}), WriteOp("update", "things", "b", {"x": 1})])
+    assert await get_document("things", "a") is None  # the whole commit failed
+
+
+async def test_queries_filter_order_and_page_like_firestore(storage):
+    rows = [("a", "u1", T0), ("b", "u1", T0 + timedelta(1)), ("c", "u2", T0), ("e", "u1", None)]
+    await commit_writes([WriteOp("set", "notes", i, {"user_id": u, "at": at}) for i, u, at in rows])
+    storage._commit({("notes", "d"): {"user_id": "u1", "at": None}})  # writes drop None values
+
+    order = [("at", True), ("__name__", True)]
+    docs = await list_documents_where("notes", "user_id", "u1", order_by=order)
+    # null sorts before every other value; documents missing the field are excluded
+    assert [d["id"] for d in docs] == ["b", "a", "d"]
+    page = await list_documents_where(
+        "notes", "user_id", "u1", order_by=order, start_after={"at": T0, "__name__": "a"}, select=["at"]
+    )
+    assert page == [{"id": "d", "at": None}]
+    later = await list_documents_where("notes", None, None, filters=[("at", ">", T0)])
+    assert [d["id"] for d in later] == ["b"]
+    streamed = [d["id"] async for d in stream_documents_where("notes", "user_id", "u1", order_by=order, limit=2)]
+    assert streamed == ["b", "a"]
+
+
+async def test_transaction_plans_from_reads(storage):
+    await set_document("counters", "c", {"n": 1})
+
+    def plan(current):
+        n = current["c"]["n"] + (current[("meta", "m")] or {}).get("step", 1)
+        return [WriteOp("update", "counters", "c", {"n": n})], n
+
+    assert await run_in_transaction("counters", ["c"], plan, [("meta", "m")]) == 2
+    assert (await get_document("counters", "c"))["n"] == 2
+
+
+async def test_commit_writes_takes_one_full_commit(storage):
+    await commit_writes(_sets("limits", MAX_WRITES_PER_COMMIT))
+    assert len(await list_documents_where("limits", None, None)) == MAX_WRITES_PER_COMMIT
+
+
+async def test_commit_writes_refuses_to_split(storage):
+    with pytest.raises(ValueError, match="writes per commit"):
+        await commit_writes(_sets("limits", MAX_WRITES_PER_COMMIT + 1))
+    assert await list_documents_where("limits", None, None) == []
+
+
+async def test_transaction_over_the_limit_writes_nothing(storage):
+    def plan(current):
+        return _sets("limits", MAX_WRITES_PER_COMMIT + 1), None
+
+    with pytest.raises(ValueError, match="writes per commit"):
+        await run_in_transaction("limits", ["d0000"], plan)
+    assert await list_documents_where("limits", None, None) == []